@@ -3,6 +3,8 @@
 Setup script for ClaudeBench Inference Server
 """
 
+import os
+
 from setuptools import setup, find_packages
 from pathlib import Path
 
@@ -10,6 +12,23 @@ from pathlib import Path
 this_directory = Path(__file__).parent
 long_description = (this_directory / "README.md").read_text()
 
+# Optional native build of the pure-Python prompt hot path.
+# Enabled with CLAUDEBENCH_USE_MYPYC=1; without it (or without mypyc
+# installed) the package is built as plain Python.
+MYPYC_MODULES = [
+    "src/claudebench_inference/prompts.py",
+]
+
+ext_modules = []
+if os.environ.get("CLAUDEBENCH_USE_MYPYC", "").lower() in ("1", "true", "yes"):
+    try:
+        from mypyc.build import mypycify
+    except ImportError:
+        print("mypyc not installed, building pure-Python package")
+    else:
+        # Only the compiled modules must type-check; imported ones are followed silently
+        ext_modules = mypycify(["--follow-imports=silent", *MYPYC_MODULES], opt_level="3")
+
 setup(
     name="claudebench-inference",
     version="0.1.0",
@@ -27,6 +46,7 @@ setup(
         ],
     },
     include_package_data=True,
+    ext_modules=ext_modules,
     install_requires=[
         "fastapi>=0.115.0",
         "uvicorn[standard]>=0.32.0",
@@ -34,9 +54,13 @@ setup(
         "python-dotenv>=1.0.0",
         "httpx>=0.27.0",
         "jinja2>=3.1.0",
+        "orjson>=3.9.0",
         "claude-code-sdk>=0.0.23",
     ],
     extras_require={
+        "cache": [
+            "redis>=5.0.0",
+        ],
         "dev": [
             "pytest>=8.3.0",
             "pytest-asyncio>=0.24.0",
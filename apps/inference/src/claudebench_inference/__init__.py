@@ -9,27 +9,34 @@ for the ClaudeBench swarm coordination system using the claude-code-sdk.
 __version__ = "0.1.0"
 __author__ = "ClaudeBench Team"
 
-from .models import (
-    DecompositionRequest,
-    DecompositionResponse,
-    ContextRequest,
-    SpecialistContextResponse,
-    ConflictRequest,
-    ResolutionResponse,
-    SynthesisRequest,
-    IntegrationResponse,
-)
-
-from .sampling import SamplingEngine
-
-__all__ = [
-    "DecompositionRequest",
-    "DecompositionResponse",
-    "ContextRequest",
-    "SpecialistContextResponse",
-    "ConflictRequest",
-    "ResolutionResponse",
-    "SynthesisRequest",
-    "IntegrationResponse",
-    "SamplingEngine",
-]
\ No newline at end of file
+from importlib import import_module
+
+# Public names are resolved lazily (PEP 562) so that importing the package,
+# e.g. for `python -m claudebench_inference.main`, does not pull in the
+# pydantic model hierarchy and claude-code-sdk until they are used.
+_LAZY_ATTRS = {
+    "DecompositionRequest": ".models",
+    "DecompositionResponse": ".models",
+    "ContextRequest": ".models",
+    "SpecialistContextResponse": ".models",
+    "ConflictRequest": ".models",
+    "ResolutionResponse": ".models",
+    "SynthesisRequest": ".models",
+    "IntegrationResponse": ".models",
+    "SamplingEngine": ".sampling",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
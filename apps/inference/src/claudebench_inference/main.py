@@ -5,15 +5,13 @@ Main FastAPI application for ClaudeBench Inference Server
 import os
 import time
 import logging
-from datetime import datetime
-from typing import Dict, Any
+from typing import Annotated, AsyncIterator, Dict, Any, Callable, List, NamedTuple, Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, status, Request
+from fastapi import Body, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-import uvicorn
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 import asyncio
 
 from .models import (
@@ -21,14 +19,14 @@ from .models import (
     ContextRequest, SpecialistContextResponse,
     ConflictRequest, ResolutionResponse,
     SynthesisRequest, IntegrationResponse,
-    HealthStatus
+    HealthStatus, construct_trusted
 )
-from .sampling import SamplingEngine
+from .sampling import SamplingEngine, MAX_CONCURRENCY
 from .prompts import PromptBuilder
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.environ.get("INFERENCE_LOG_LEVEL", "INFO").upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -40,31 +38,139 @@ start_time: float = None
 
 # Configuration
 REQUEST_TIMEOUT_SECONDS = 600  # 10 minutes for LLM operations with extensive exploration
+# Requests allowed in flight before new ones are rejected with 503
+MAX_INFLIGHT = int(os.environ.get("MAX_INFLIGHT", str(2 * MAX_CONCURRENCY)))
+# Most contexts in one /api/v1/context/batch call; the whole batch counts as
+# a single in-flight request
+CONTEXT_BATCH_MAX_SIZE = MAX_INFLIGHT
+# Paths that are never rejected (probes and monitoring)
+INFLIGHT_EXEMPT_PATHS = frozenset({"/health", "/api/v1/stats"})
+# Fully validate sampled JSON in the endpoint instead of constructing it directly
+STRICT_VALIDATION = os.environ.get("STRICT_VALIDATION", "").lower() in ("1", "true", "yes")
+
+# Parsed once at import; CORS origins never change for the process lifetime
+_CORS_ORIGINS = tuple(
+    origin.strip()
+    for origin in os.environ.get("CORS_ORIGINS", "http://localhost:3000,http://localhost:3001").split(",")
+    if origin.strip()
+)
+
+# Static part of the health payload
+_HEALTH_CONFIG = {
+    "request_timeout": REQUEST_TIMEOUT_SECONDS,
+    "endpoints": {
+        "/api/v1/decompose": "Task decomposition (600s timeout)",
+        "/api/v1/context": "Context generation (600s timeout)",
+        "/api/v1/conflict": "Conflict resolution (600s timeout)",
+        "/api/v1/synthesize": "Progress synthesis (600s timeout)"
+    }
+}
+
+# Cached UTC timestamp, rebuilt at most once per second
+_timestamp_second: int = -1
+_timestamp_iso: str = ""
+
 
+def utc_timestamp() -> str:
+    """Return the current UTC time as an ISO-8601 string (second resolution)"""
+    global _timestamp_second, _timestamp_iso
+    now = int(time.time())
+    if now != _timestamp_second:
+        _timestamp_iso = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now))
+        _timestamp_second = now
+    return _timestamp_iso
 
-class TimeoutMiddleware(BaseHTTPMiddleware):
-    """Middleware to enforce request timeout"""
+
+def make_decoder(model_cls) -> Callable[[str], Any]:
+    """
+    Build the decoder turning an endpoint's sampled JSON text into its response model
+    
+    Only request models are fully validated. By default the sampled data is
+    shape-checked (required keys, enum values) and constructed with
+    model_construct; FastAPI passes model instances through its
+    response_model check without revalidating them, so nothing else is
+    validated on the way out. In strict mode the model's compiled
+    pydantic-core validator decodes the JSON text directly. Decoders are
+    built once per response type at import time.
+    """
+    if STRICT_VALIDATION:
+        return model_cls.__pydantic_validator__.validate_json
+    
+    def decode(json_str: str) -> Any:
+        return construct_trusted(model_cls, sampling_engine.parse_json(json_str))
+    
+    return decode
+
+
+class TimeoutMiddleware:
+    """Pure ASGI middleware to enforce request timeout"""
     
     def __init__(self, app, timeout: int = REQUEST_TIMEOUT_SECONDS):
-        super().__init__(app)
+        self.app = app
         self.timeout = timeout
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        response_started = False
+        
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
         try:
             # Set timeout for the request
-            return await asyncio.wait_for(
-                call_next(request),
+            await asyncio.wait_for(
+                self.app(scope, receive, send_wrapper),
                 timeout=self.timeout
             )
         except asyncio.TimeoutError:
-            logger.error(f"Request timeout after {self.timeout} seconds: {request.url.path}")
-            return JSONResponse(
+            logger.error("Request timeout after %s seconds: %s", self.timeout, scope["path"])
+            if response_started:
+                # Headers are already on the wire; nothing useful can be sent
+                raise
+            response = ORJSONResponse(
                 status_code=status.HTTP_504_GATEWAY_TIMEOUT,
                 content={
                     "detail": f"Request timeout after {self.timeout} seconds. LLM operations may take time, please retry.",
                     "timeout": self.timeout
                 }
             )
+            await response(scope, receive, send)
+
+
+class InflightLimitMiddleware:
+    """Pure ASGI middleware that sheds load once too many requests are in flight"""
+    
+    def __init__(self, app, max_inflight: int = MAX_INFLIGHT):
+        self.app = app
+        self.max_inflight = max_inflight
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in INFLIGHT_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        state = scope["app"].state
+        if state.inflight >= self.max_inflight:
+            logger.warning("Rejecting %s: %d requests already in flight", scope["path"], state.inflight)
+            response = ORJSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server is at capacity, please retry", "inflight": state.inflight},
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+        
+        state.inflight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            state.inflight -= 1
 
 
 @asynccontextmanager
@@ -76,13 +182,15 @@ async def lifespan(app: FastAPI):
     logger.info("Starting ClaudeBench Inference Server...")
     start_time = time.time()
     sampling_engine = SamplingEngine()
-    prompt_builder = PromptBuilder()
+    await sampling_engine.start()
+    prompt_builder = PromptBuilder()  # Compiles all templates before the first request
     logger.info("Inference server ready!")
     
     yield
     
     # Shutdown
     logger.info("Shutting down ClaudeBench Inference Server...")
+    await sampling_engine.aclose()
 
 
 # Create FastAPI app
@@ -90,16 +198,22 @@ app = FastAPI(
     title="ClaudeBench Inference Server",
     description="LLM sampling service for ClaudeBench swarm coordination using claude-code-sdk",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Responses carry deeply nested lists; serialize them with orjson
+    default_response_class=ORJSONResponse
 )
 
 # Add timeout middleware (600 seconds for LLM operations)
 app.add_middleware(TimeoutMiddleware, timeout=REQUEST_TIMEOUT_SECONDS)
 
+# Shed load before requests pile up behind the sampling semaphore
+app.state.inflight = 0
+app.add_middleware(InflightLimitMiddleware, max_inflight=MAX_INFLIGHT)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=os.environ.get("CORS_ORIGINS", "http://localhost:3000,http://localhost:3001").split(","),
+    allow_origins=_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -109,7 +223,7 @@ app.add_middleware(
 # Exception handlers
 @app.exception_handler(ValueError)
 async def value_error_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={"detail": str(exc)}
     )
@@ -117,8 +231,8 @@ async def value_error_handler(request, exc):
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "Internal server error"}
     )
@@ -129,255 +243,334 @@ async def general_exception_handler(request, exc):
 async def health_check():
     """Health check endpoint"""
     uptime = time.time() - start_time if start_time else 0
-    stats = sampling_engine.get_stats() if sampling_engine else {}
     
-    return HealthStatus(
+    return HealthStatus.model_construct(
         status="healthy",
         service="claudebench-inference",
         version="0.1.0",
-        timestamp=datetime.utcnow().isoformat(),
+        timestamp=utc_timestamp(),
         uptime=uptime,
-        requests_processed=stats.get("total_requests", 0),
-        config={
-            "request_timeout": REQUEST_TIMEOUT_SECONDS,
-            "endpoints": {
-                "/api/v1/decompose": "Task decomposition (600s timeout)",
-                "/api/v1/context": "Context generation (600s timeout)",
-                "/api/v1/conflict": "Conflict resolution (600s timeout)",
-                "/api/v1/synthesize": "Progress synthesis (600s timeout)"
-            }
-        }
+        requests_processed=sampling_engine.total_requests if sampling_engine else 0,
+        config=_HEALTH_CONFIG
     )
 
 
-# Decomposition endpoint
-@app.post("/api/v1/decompose", response_model=DecompositionResponse)
-async def decompose_task(request: DecompositionRequest):
-    """
-    Decompose a complex task into subtasks for parallel specialist execution
+def log_decomposition(response: DecompositionResponse) -> None:
+    """Log a readable summary of a decomposition at DEBUG level"""
+    logger.debug("=" * 80)
+    logger.debug("DECOMPOSITION RESULTS:")
+    logger.debug("Execution Strategy: %s", response.executionStrategy)
+    logger.debug("Total Complexity: %s", response.totalComplexity)
+    logger.debug("Reasoning: %s", response.reasoning)
+    
+    if response.architecturalConsiderations:
+        logger.debug("-" * 40)
+        logger.debug("Architectural Considerations:")
+        for consideration in response.architecturalConsiderations[:3]:
+            logger.debug("  • %s", consideration)
+    
+    logger.debug("-" * 40)
+    for i, subtask in enumerate(response.subtasks, 1):
+        logger.debug("Subtask %d (%s):", i, subtask.id)
+        logger.debug("  Specialist: %s", subtask.specialist)
+        logger.debug("  Description: %s", subtask.description)
+        logger.debug("  Complexity: %s", subtask.complexity)
+        logger.debug("  Est. Minutes: %s", subtask.estimatedMinutes)
+        logger.debug("  Dependencies: %s", subtask.dependencies)
+        if subtask.rationale:
+            logger.debug("  Rationale: %.100s...", subtask.rationale)
+        if subtask.context:
+            logger.debug("  Context hints: %d files, %d patterns", len(subtask.context.files), len(subtask.context.patterns))
+    logger.debug("=" * 80)
+
+
+def log_context(specialist: str, response: SpecialistContextResponse) -> None:
+    """Log a readable summary of a generated specialist context at DEBUG level"""
+    logger.debug("=" * 80)
+    logger.debug("CONTEXT GENERATED FOR %s SPECIALIST:", specialist.upper())
+    logger.debug("Task ID: %s", response.taskId)
+    logger.debug("Description: %s", response.description)
+    logger.debug("Scope: %s", response.scope)
+    logger.debug("-" * 40)
+    logger.debug("Mandatory Readings:")
+    for reading in response.mandatoryReadings[:3]:  # Show first 3
+        logger.debug("  - %s (%s)", reading.title, reading.path)
+        logger.debug("    Reason: %s", reading.reason)
+    if len(response.mandatoryReadings) > 3:
+        logger.debug("  ... and %d more", len(response.mandatoryReadings) - 3)
+    logger.debug("-" * 40)
+    
+    if response.discoveredPatterns:
+        logger.debug("Discovered Patterns:")
+        if response.discoveredPatterns.conventions:
+            logger.debug("  Conventions: %s", ", ".join(response.discoveredPatterns.conventions[:3]))
+        if response.discoveredPatterns.technologies:
+            logger.debug("  Technologies: %s", ", ".join(response.discoveredPatterns.technologies[:3]))
+        if response.discoveredPatterns.approaches:
+            logger.debug("  Approaches: %s", ", ".join(response.discoveredPatterns.approaches[:3]))
+        logger.debug("-" * 40)
+    
+    if response.integrationPoints:
+        logger.debug("Integration Points:")
+        for point in response.integrationPoints[:2]:  # Show first 2
+            logger.debug("  - %s: %s", point.component, point.interface)
+        if len(response.integrationPoints) > 2:
+            logger.debug("  ... and %d more", len(response.integrationPoints) - 2)
+        logger.debug("-" * 40)
+    
+    logger.debug("Success Criteria:")
+    for criteria in response.successCriteria[:3]:  # Show first 3
+        logger.debug("  ✓ %s", criteria)
+    if len(response.successCriteria) > 3:
+        logger.debug("  ... and %d more", len(response.successCriteria) - 3)
+    
+    if response.recommendedApproach:
+        logger.debug("-" * 40)
+        logger.debug("Recommended Approach: %.200s...", response.recommendedApproach)
+    
+    logger.debug("=" * 80)
+
+
+class EndpointSpec(NamedTuple):
+    """How a sampling endpoint turns its request into a prompt and a response"""
+    name: str
+    decode_response: Callable[[str], Any]
+    build_prompt: Callable[[Any], str]
+    max_tokens: int
+    temperature: float
+    working_directory: Optional[Callable[[Any], Optional[str]]] = None
+    log_result: Optional[Callable[[Any, Any], None]] = None
+
+
+def decomposition_working_directory(request: DecompositionRequest) -> Optional[str]:
+    """Working directory from the decomposition context, if provided"""
+    if request.context and hasattr(request.context, 'workingDirectory'):
+        return request.context.workingDirectory
+    return None
+
+
+def context_working_directory(request: ContextRequest) -> Optional[str]:
+    """Working directory from the subtask metadata, if provided"""
+    if request.subtask and isinstance(request.subtask, dict):
+        return request.subtask.get('workingDirectory')
+    return None
+
+
+def log_decomposition_result(request: DecompositionRequest, response: DecompositionResponse) -> None:
+    logger.info("Decomposed into %d subtasks", len(response.subtasks))
+    if logger.isEnabledFor(logging.DEBUG):
+        log_decomposition(response)
+
+
+def log_context_result(request: ContextRequest, response: SpecialistContextResponse) -> None:
+    if logger.isEnabledFor(logging.DEBUG):
+        log_context(request.specialist, response)
+
+
+DECOMPOSE = EndpointSpec(
+    name="Decomposition",
+    decode_response=make_decoder(DecompositionResponse),
+    build_prompt=lambda request: prompt_builder.build_decomposition_prompt(
+        task=request.task,
+        context=request.context
+    ),
+    max_tokens=8192,
+    temperature=0.7,
+    working_directory=decomposition_working_directory,
+    log_result=log_decomposition_result
+)
+
+CONTEXT = EndpointSpec(
+    name="Context generation",
+    decode_response=make_decoder(SpecialistContextResponse),
+    build_prompt=lambda request: prompt_builder.build_context_prompt(
+        subtaskId=request.subtaskId,
+        specialist=request.specialist,
+        subtask=request.subtask
+    ),
+    max_tokens=16384,
+    temperature=0.5,  # Lower temperature for more focused context
+    working_directory=context_working_directory,
+    log_result=log_context_result
+)
+
+RESOLVE = EndpointSpec(
+    name="Conflict resolution",
+    decode_response=make_decoder(ResolutionResponse),
+    build_prompt=lambda request: prompt_builder.build_conflict_prompt(
+        solutions=request.solutions,
+        context=request.context
+    ),
+    max_tokens=8192,
+    temperature=0.3,  # Low temperature for decision-making
+    log_result=lambda request, response: logger.info("Resolved conflict: chose %s", response.instanceId)
+)
+
+SYNTHESIZE = EndpointSpec(
+    name="Synthesis",
+    decode_response=make_decoder(IntegrationResponse),
+    build_prompt=lambda request: prompt_builder.build_synthesis_prompt(
+        completedSubtasks=request.completedSubtasks,
+        parentTask=request.parentTask
+    ),
+    max_tokens=4096,
+    temperature=0.6,
+    log_result=lambda request, response: logger.info("Synthesis complete: status=%s", response.status)
+)
+
+
+def prepare_sampling(spec: EndpointSpec, request: Any) -> Dict[str, Any]:
+    """Build the prompt and sampling arguments for an endpoint request"""
+    working_directory = None
+    if spec.working_directory is not None:
+        working_directory = spec.working_directory(request)
+        if working_directory:
+            logger.debug("%s using working directory: %s", spec.name, working_directory)
+    
+    return {
+        "prompt": spec.build_prompt(request),
+        "max_tokens": spec.max_tokens,
+        "temperature": spec.temperature,
+        "working_directory": working_directory
+    }
+
+
+async def run_endpoint(spec: EndpointSpec, request: Any, stream: bool = False) -> Any:
     """
-    logger.info(f"Decomposition request for session {request.sessionId}: {request.task[:50]}...")
+    Shared body of the sampling endpoints: prompt, sample, build response
     
+    Raises:
+        HTTPException: 400 for invalid sampled output, 500 for any other failure
+    """
     try:
-        # Extract working directory from context if provided
-        working_directory = None
-        if request.context and hasattr(request.context, 'workingDirectory'):
-            working_directory = request.context.workingDirectory
-            if working_directory:
-                logger.info(f"Using working directory for decomposition: {working_directory}")
+        sampling_args = prepare_sampling(spec, request)
+        if stream:
+            return StreamingResponse(
+                stream_endpoint(spec, request, sampling_args),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
         
-        # Build the prompt
-        prompt = prompt_builder.build_decomposition_prompt(
-            task=request.task,
-            context=request.context
-        )
-        
-        # Perform sampling with working directory
-        result = await sampling_engine.sample_json(
-            prompt=prompt,
-            max_tokens=8192,
-            temperature=0.7,
-            working_directory=working_directory
-        )
+        result = await sampling_engine.sample_json_raw(**sampling_args)
         
         # Validate and return response
-        response = DecompositionResponse(**result)
-        logger.info(f"Decomposed into {len(response.subtasks)} subtasks")
-        
-        # Log detailed decomposition results
-        logger.info("=" * 80)
-        logger.info("DECOMPOSITION RESULTS:")
-        logger.info(f"Execution Strategy: {response.executionStrategy}")
-        logger.info(f"Total Complexity: {response.totalComplexity}")
-        logger.info(f"Reasoning: {response.reasoning}")
-        
-        if response.architecturalConsiderations:
-            logger.info("-" * 40)
-            logger.info("Architectural Considerations:")
-            for consideration in response.architecturalConsiderations[:3]:
-                logger.info(f"  • {consideration}")
-        
-        logger.info("-" * 40)
-        for i, subtask in enumerate(response.subtasks, 1):
-            logger.info(f"Subtask {i} ({subtask.id}):")
-            logger.info(f"  Specialist: {subtask.specialist}")
-            logger.info(f"  Description: {subtask.description}")
-            logger.info(f"  Complexity: {subtask.complexity}")
-            logger.info(f"  Est. Minutes: {subtask.estimatedMinutes}")
-            logger.info(f"  Dependencies: {subtask.dependencies}")
-            if subtask.rationale:
-                logger.info(f"  Rationale: {subtask.rationale[:100]}...")
-            if subtask.context:
-                logger.info(f"  Context hints: {len(subtask.context.files)} files, {len(subtask.context.patterns)} patterns")
-        logger.info("=" * 80)
-        
+        response = spec.decode_response(result)
+        if spec.log_result is not None:
+            spec.log_result(request, response)
         return response
         
     except ValueError as e:
-        logger.error(f"Decomposition validation error: {e}")
+        logger.error("%s validation error: %s", spec.name, e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Decomposition failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Decomposition failed: {str(e)}")
+        logger.error("%s failed: %s", spec.name, e)
+        raise HTTPException(status_code=500, detail=f"{spec.name} failed: {str(e)}")
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one server-sent event with a JSON payload"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def stream_endpoint(spec: EndpointSpec, request: Any, sampling_args: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """
+    Server-sent event stream for an endpoint called with ?stream=1
+    
+    Emits a "chunk" event per piece of text produced by the SDK, then a single
+    "result" event with the response model, or an "error" event carrying the
+    same status/detail the non-streaming endpoint would have returned.
+    """
+    parts = []
+    try:
+        async for text in sampling_engine.sample_stream(**sampling_args):
+            parts.append(text)
+            yield sse_event("chunk", text)
+        
+        response = spec.decode_response(sampling_engine.extract_json_text("".join(parts)))
+        if spec.log_result is not None:
+            spec.log_result(request, response)
+        yield sse_event("result", response.model_dump(mode="json"))
+        
+    except ValueError as e:
+        logger.error("%s validation error: %s", spec.name, e)
+        yield sse_event("error", {"status": 400, "detail": str(e)})
+    except Exception as e:
+        logger.error("%s failed: %s", spec.name, e)
+        yield sse_event("error", {"status": 500, "detail": f"{spec.name} failed: {str(e)}"})
+
+
+# Decomposition endpoint
+@app.post("/api/v1/decompose", response_model=DecompositionResponse)
+async def decompose_task(request: DecompositionRequest, stream: bool = False):
+    """
+    Decompose a complex task into subtasks for parallel specialist execution
+    """
+    logger.info("Decomposition request for session %s: %.50s...", request.sessionId, request.task)
+    return await run_endpoint(DECOMPOSE, request, stream)
 
 
 # Context generation endpoint
 @app.post("/api/v1/context", response_model=SpecialistContextResponse)
-async def generate_context(request: ContextRequest):
+async def generate_context(request: ContextRequest, stream: bool = False):
     """
     Generate execution context for a specialist subtask
     """
-    logger.info(f"Context generation for subtask {request.subtaskId}")
+    logger.info("Context generation for subtask %s", request.subtaskId)
+    return await run_endpoint(CONTEXT, request, stream)
+
+
+# Batched context generation endpoint
+@app.post("/api/v1/context/batch", response_model=List[SpecialistContextResponse])
+async def generate_context_batch(requests: Annotated[List[ContextRequest], Body(max_length=CONTEXT_BATCH_MAX_SIZE)]):
+    """
+    Generate execution contexts for several specialist subtasks in one call
+    
+    At most CONTEXT_BATCH_MAX_SIZE subtasks per call; the first failure
+    cancels the rest.
+    """
+    logger.info("Context generation for %d subtasks", len(requests))
+    spec = CONTEXT
     
     try:
-        # Extract working directory from subtask metadata if provided
-        working_directory = None
-        if request.subtask and isinstance(request.subtask, dict):
-            working_directory = request.subtask.get('workingDirectory')
-            if working_directory:
-                logger.info(f"Using working directory: {working_directory}")
-        
-        # Build the prompt
-        prompt = prompt_builder.build_context_prompt(
-            subtaskId=request.subtaskId,
-            specialist=request.specialist,
-            subtask=request.subtask
-        )
-        
-        # Perform sampling with working directory
-        result = await sampling_engine.sample_json(
-            prompt=prompt,
-            max_tokens=16384,
-            temperature=0.5,  # Lower temperature for more focused context
-            working_directory=working_directory
+        batch_args = [prepare_sampling(spec, request) for request in requests]
+        results = await sampling_engine.sample_json_raw_batch(
+            prompts=[args["prompt"] for args in batch_args],
+            max_tokens=spec.max_tokens,
+            temperature=spec.temperature,
+            working_directories=[args["working_directory"] for args in batch_args]
         )
         
-        # Validate and return response
-        response = SpecialistContextResponse(**result)
-        
-        # Log detailed context generation results
-        logger.info("=" * 80)
-        logger.info(f"CONTEXT GENERATED FOR {request.specialist.upper()} SPECIALIST:")
-        logger.info(f"Task ID: {response.taskId}")
-        logger.info(f"Description: {response.description}")
-        logger.info(f"Scope: {response.scope}")
-        logger.info("-" * 40)
-        logger.info("Mandatory Readings:")
-        for reading in response.mandatoryReadings[:3]:  # Show first 3
-            logger.info(f"  - {reading.title} ({reading.path})")
-            logger.info(f"    Reason: {reading.reason}")
-        if len(response.mandatoryReadings) > 3:
-            logger.info(f"  ... and {len(response.mandatoryReadings) - 3} more")
-        logger.info("-" * 40)
-        
-        if response.discoveredPatterns:
-            logger.info("Discovered Patterns:")
-            if response.discoveredPatterns.conventions:
-                logger.info(f"  Conventions: {', '.join(response.discoveredPatterns.conventions[:3])}")
-            if response.discoveredPatterns.technologies:
-                logger.info(f"  Technologies: {', '.join(response.discoveredPatterns.technologies[:3])}")
-            if response.discoveredPatterns.approaches:
-                logger.info(f"  Approaches: {', '.join(response.discoveredPatterns.approaches[:3])}")
-            logger.info("-" * 40)
-        
-        if response.integrationPoints:
-            logger.info("Integration Points:")
-            for point in response.integrationPoints[:2]:  # Show first 2
-                logger.info(f"  - {point.component}: {point.interface}")
-            if len(response.integrationPoints) > 2:
-                logger.info(f"  ... and {len(response.integrationPoints) - 2} more")
-            logger.info("-" * 40)
-        
-        logger.info("Success Criteria:")
-        for criteria in response.successCriteria[:3]:  # Show first 3
-            logger.info(f"  ✓ {criteria}")
-        if len(response.successCriteria) > 3:
-            logger.info(f"  ... and {len(response.successCriteria) - 3} more")
-        
-        if response.recommendedApproach:
-            logger.info("-" * 40)
-            logger.info(f"Recommended Approach: {response.recommendedApproach[:200]}...")
-        
-        logger.info("=" * 80)
-        
-        return response
+        responses = [spec.decode_response(result) for result in results]
+        for request, response in zip(requests, responses):
+            spec.log_result(request, response)
+        return responses
         
     except ValueError as e:
-        logger.error(f"Context generation validation error: {e}")
+        logger.error("%s validation error: %s", spec.name, e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Context generation failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Context generation failed: {str(e)}")
+        logger.error("%s failed: %s", spec.name, e)
+        raise HTTPException(status_code=500, detail=f"{spec.name} failed: {str(e)}")
 
 
 # Conflict resolution endpoint
 @app.post("/api/v1/resolve", response_model=ResolutionResponse)
-async def resolve_conflict(request: ConflictRequest):
+async def resolve_conflict(request: ConflictRequest, stream: bool = False):
     """
     Resolve conflicts between competing specialist solutions
     """
-    logger.info(f"Conflict resolution for {len(request.solutions)} solutions")
-    
-    try:
-        # Build the prompt
-        prompt = prompt_builder.build_conflict_prompt(
-            solutions=request.solutions,
-            context=request.context
-        )
-        
-        # Perform sampling
-        result = await sampling_engine.sample_json(
-            prompt=prompt,
-            max_tokens=8192,
-            temperature=0.3  # Low temperature for decision-making
-        )
-        
-        # Validate and return response
-        response = ResolutionResponse(**result)
-        logger.info(f"Resolved conflict: chose {response.instanceId}")
-        return response
-        
-    except ValueError as e:
-        logger.error(f"Conflict resolution validation error: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Conflict resolution failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Conflict resolution failed: {str(e)}")
+    logger.info("Conflict resolution for %d solutions", len(request.solutions))
+    return await run_endpoint(RESOLVE, request, stream)
 
 
 # Synthesis endpoint
 @app.post("/api/v1/synthesize", response_model=IntegrationResponse)
-async def synthesize_progress(request: SynthesisRequest):
+async def synthesize_progress(request: SynthesisRequest, stream: bool = False):
     """
     Synthesize completed subtasks into an integrated solution
     """
-    logger.info(f"Synthesizing {len(request.completedSubtasks)} completed subtasks")
-    
-    try:
-        # Build the prompt
-        prompt = prompt_builder.build_synthesis_prompt(
-            completedSubtasks=request.completedSubtasks,
-            parentTask=request.parentTask
-        )
-        
-        # Perform sampling
-        result = await sampling_engine.sample_json(
-            prompt=prompt,
-            max_tokens=4096,
-            temperature=0.6
-        )
-        
-        # Validate and return response
-        response = IntegrationResponse(**result)
-        logger.info(f"Synthesis complete: status={response.status}")
-        return response
-        
-    except ValueError as e:
-        logger.error(f"Synthesis validation error: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Synthesis failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Synthesis failed: {str(e)}")
+    logger.info("Synthesizing %d completed subtasks", len(request.completedSubtasks))
+    return await run_endpoint(SYNTHESIZE, request, stream)
 
 
 # Stats endpoint
@@ -389,27 +582,37 @@ async def get_stats():
     
     return {
         "uptime": uptime,
+        "inflight_requests": app.state.inflight,
+        "max_inflight": MAX_INFLIGHT,
         "sampling_stats": stats,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": utc_timestamp()
     }
 
 
 def main():
     """Main entry point for the server"""
+    import uvicorn  # Deferred: only needed when running the server directly
+    
     host = os.environ.get("INFERENCE_HOST", "0.0.0.0")
     port = int(os.environ.get("INFERENCE_PORT", "8000"))
     reload = os.environ.get("INFERENCE_RELOAD", "false").lower() == "true"
+    workers = int(os.environ.get("INFERENCE_WORKERS", "1"))
+    # Recycle workers after this many requests to bound memory growth (0 disables)
+    limit_max_requests = int(os.environ.get("INFERENCE_LIMIT_MAX_REQUESTS", "1000")) or None
     
-    logger.info(f"Starting server on {host}:{port} with {REQUEST_TIMEOUT_SECONDS}s timeout")
+    logger.info("Starting server on %s:%s with %ss timeout", host, port, REQUEST_TIMEOUT_SECONDS)
     uvicorn.run(
         "claudebench_inference.main:app",
         host=host,
         port=port,
         reload=reload,
+        workers=workers,
+        loop="auto",  # uvloop and httptools when installed
+        http="auto",
         log_level="info",
         timeout_keep_alive=REQUEST_TIMEOUT_SECONDS,  # Keep connections alive for long requests
         timeout_graceful_shutdown=30,  # 30s graceful shutdown
-        limit_max_requests=1000  # Restart workers after 1000 requests to prevent memory issues
+        limit_max_requests=limit_max_requests
     )
 
 
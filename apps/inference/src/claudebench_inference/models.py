@@ -2,10 +2,14 @@
 Pydantic models for ClaudeBench Inference Server
 """
 
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field, field_validator
+from functools import cached_property, lru_cache
+from typing import Dict, Any, List, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic.dataclasses import dataclass
 from enum import Enum
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 
 class SpecialistType(str, Enum):
     """Enumeration of specialist types"""
@@ -31,7 +35,11 @@ class IntegrationStatus(str, Enum):
 
 
 # Request Models
-class Specialist(BaseModel):
+# Leaf items and flat contexts of requests are slotted pydantic dataclasses:
+# still validated at ingress as part of their request, but lighter to hold and
+# hand to templates.
+@dataclass(slots=True)
+class Specialist:
     """Specialist worker information"""
     id: str
     type: str
@@ -39,12 +47,11 @@ class Specialist(BaseModel):
     currentLoad: int = Field(ge=0)
     maxCapacity: int = Field(gt=0)
     
-    @field_validator('currentLoad')
-    @classmethod
-    def validate_load(cls, v: int, info) -> int:
-        if 'maxCapacity' in info.data and v > info.data['maxCapacity']:
+    @model_validator(mode='after')
+    def validate_load(self) -> 'Specialist':
+        if self.currentLoad > self.maxCapacity:
             raise ValueError('currentLoad cannot exceed maxCapacity')
-        return v
+        return self
 
 
 class DecompositionContext(BaseModel):
@@ -53,6 +60,16 @@ class DecompositionContext(BaseModel):
     priority: int = Field(ge=0, le=100)
     constraints: Optional[List[str]] = Field(default_factory=list)
     workingDirectory: Optional[str] = None  # Working directory for codebase exploration
+    
+    @cached_property
+    def specialists_rendered(self) -> str:
+        """Specialist roster as listed in the decomposition prompt, built once per request"""
+        return "".join(
+            f"  - {s.type} (ID: {s.id})\n"
+            f"    Available capacity: {s.maxCapacity - s.currentLoad}\n"
+            f"    Capabilities: {', '.join(s.capabilities[:3])}\n"
+            for s in self.specialists
+        )
 
 
 class DecompositionRequest(BaseModel):
@@ -70,7 +87,8 @@ class ContextRequest(BaseModel):
     subtask: Dict[str, Any]
 
 
-class ConflictSolution(BaseModel):
+@dataclass(slots=True)
+class ConflictSolution:
     """A proposed solution from a specialist"""
     instanceId: str
     approach: str
@@ -78,7 +96,8 @@ class ConflictSolution(BaseModel):
     code: Optional[str] = None
 
 
-class ConflictContext(BaseModel):
+@dataclass(slots=True)
+class ConflictContext:
     """Context for conflict resolution"""
     projectType: str
     requirements: List[str]
@@ -92,7 +111,8 @@ class ConflictRequest(BaseModel):
     context: ConflictContext
 
 
-class CompletedSubtask(BaseModel):
+@dataclass(slots=True)
+class CompletedSubtask:
     """A completed subtask from a specialist"""
     id: str
     specialist: str
@@ -108,14 +128,24 @@ class SynthesisRequest(BaseModel):
 
 
 # Response Models
-class SubtaskContext(BaseModel):
+class ResponseModel(BaseModel):
+    """
+    Base for response models
+    
+    Responses are built once and only read afterwards, so they are frozen;
+    unexpected keys in sampled JSON are dropped.
+    """
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+
+class SubtaskContext(ResponseModel):
     """Context information for a subtask"""
     files: List[str] = Field(default_factory=list)
     patterns: List[str] = Field(default_factory=list)
     constraints: List[str] = Field(default_factory=list)
 
 
-class Subtask(BaseModel):
+class Subtask(ResponseModel):
     """A decomposed subtask"""
     id: str
     description: str
@@ -127,7 +157,7 @@ class Subtask(BaseModel):
     rationale: Optional[str] = None  # Why this subtask is necessary
 
 
-class DecompositionResponse(BaseModel):
+class DecompositionResponse(ResponseModel):
     """Response containing decomposed subtasks"""
     subtasks: List[Subtask]
     executionStrategy: ExecutionStrategy
@@ -136,35 +166,35 @@ class DecompositionResponse(BaseModel):
     architecturalConsiderations: Optional[List[str]] = Field(default_factory=list)  # Key architectural decisions
 
 
-class MandatoryReading(BaseModel):
+class MandatoryReading(ResponseModel):
     """A required reading for context"""
     title: str
     path: str
     reason: str  # Added: why this is important
 
 
-class RelatedWork(BaseModel):
+class RelatedWork(ResponseModel):
     """Related work from other specialists"""
     instanceId: str
     status: str
     summary: str
 
 
-class DiscoveredPatterns(BaseModel):
+class DiscoveredPatterns(ResponseModel):
     """Patterns discovered during exploration"""
     conventions: List[str] = Field(default_factory=list)
     technologies: List[str] = Field(default_factory=list)
     approaches: List[str] = Field(default_factory=list)
 
 
-class IntegrationPoint(BaseModel):
+class IntegrationPoint(ResponseModel):
     """Integration point with other components"""
     component: str
     interface: str
     considerations: str
 
 
-class SpecialistContextResponse(BaseModel):
+class SpecialistContextResponse(ResponseModel):
     """Context for specialist execution"""
     taskId: str
     description: str
@@ -178,7 +208,7 @@ class SpecialistContextResponse(BaseModel):
     recommendedApproach: Optional[str] = None
 
 
-class ResolutionResponse(BaseModel):
+class ResolutionResponse(ResponseModel):
     """Conflict resolution decision"""
     chosenSolution: str
     instanceId: str
@@ -187,7 +217,7 @@ class ResolutionResponse(BaseModel):
     modifications: Optional[List[str]] = Field(default_factory=list)
 
 
-class IntegrationResponse(BaseModel):
+class IntegrationResponse(ResponseModel):
     """Progress synthesis and integration result"""
     status: IntegrationStatus
     integrationSteps: List[str] = Field(default_factory=list)
@@ -197,7 +227,7 @@ class IntegrationResponse(BaseModel):
 
 
 # Health Check Models
-class HealthStatus(BaseModel):
+class HealthStatus(ResponseModel):
     """Health check response"""
     status: str
     service: str
@@ -205,4 +235,94 @@ class HealthStatus(BaseModel):
     timestamp: str
     uptime: float
     requests_processed: int = 0
-    config: Optional[Dict[str, Any]] = None  # Configuration info including timeouts
\ No newline at end of file
+    config: Optional[Dict[str, Any]] = None  # Configuration info including timeouts
+
+
+# Trusted construction helpers
+def _nested_type(annotation: Any) -> Tuple[Optional[type], bool]:
+    """
+    Resolve the BaseModel or Enum type carried by a field annotation
+    
+    Returns:
+        (nested_class, is_list) - nested_class is None for plain fields
+    """
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _nested_type(args[0]) if len(args) == 1 else (None, False)
+    if origin in (list, List):
+        args = get_args(annotation)
+        nested, _ = _nested_type(args[0]) if args else (None, False)
+        return nested, nested is not None
+    if isinstance(annotation, type) and issubclass(annotation, (BaseModel, Enum)):
+        return annotation, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def _construct_plan(model_cls: Type[BaseModel]) -> Tuple[Tuple[str, ...], Dict[str, Tuple[type, bool]]]:
+    """Precompute required field names and nested model/enum fields for a model class"""
+    required = tuple(name for name, field in model_cls.model_fields.items() if field.is_required())
+    nested = {}
+    for name, field in model_cls.model_fields.items():
+        nested_cls, is_list = _nested_type(field.annotation)
+        if nested_cls is not None:
+            nested[name] = (nested_cls, is_list)
+    return required, nested
+
+
+def _construct_value(nested_cls: type, value: Any) -> Any:
+    """
+    Construct a single nested model or coerce a single enum value
+    
+    Raises:
+        ValueError: If a model value is not a dict or an enum value is unknown
+    """
+    if issubclass(nested_cls, Enum):
+        return nested_cls(value)
+    if not isinstance(value, dict):
+        raise ValueError(f"{nested_cls.__name__} expects a JSON object, got {type(value).__name__}")
+    return construct_trusted(nested_cls, value)
+
+
+def construct_trusted(model_cls: Type[ModelT], data: Dict[str, Any]) -> ModelT:
+    """
+    Build a model from already-parsed data without running full validation
+    
+    Only the outer shape is checked (dict with all required keys); nested
+    models are constructed recursively with model_construct and enum fields
+    are coerced, so the instance behaves like a validated one.
+    
+    Args:
+        model_cls: The model class to construct
+        data: Parsed JSON data
+        
+    Returns:
+        Constructed model instance
+        
+    Raises:
+        ValueError: If data is not a dict, is missing required fields, holds
+            a non-object for a nested model, a non-array for a list of
+            models or an unknown enum value
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"{model_cls.__name__} expects a JSON object, got {type(data).__name__}")
+    
+    required, nested = _construct_plan(model_cls)
+    missing = [name for name in required if name not in data]
+    if missing:
+        raise ValueError(f"{model_cls.__name__} missing required fields: {', '.join(missing)}")
+    
+    values = dict(data)
+    for name, (nested_cls, is_list) in nested.items():
+        value = values.get(name)
+        if value is None:
+            continue
+        if is_list:
+            if not isinstance(value, list):
+                raise ValueError(f"{model_cls.__name__}.{name} expects a JSON array, got {type(value).__name__}")
+            values[name] = [_construct_value(nested_cls, item) for item in value]
+        else:
+            values[name] = _construct_value(nested_cls, value)
+    
+    return model_cls.model_construct(**values)
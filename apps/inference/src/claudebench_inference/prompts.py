@@ -3,9 +3,13 @@ Prompt builder using Jinja2 templates
 """
 
 import os
+import sys
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Hashable, List, Dict, Any, Optional
+from jinja2 import BytecodeCache, Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
 
 from .models import (
     DecompositionContext,
@@ -15,29 +19,157 @@ from .models import (
 )
 
 
+# Templates shipped with the package. Resolved from the package rather than
+# this module's __file__, which a mypyc-compiled module lacks at import time.
+DEFAULT_TEMPLATE_DIR = str(Path(sys.modules[__name__.rpartition(".")[0]].__file__ or ".").parent / "templates")
+
+# Templates compiled when a PromptBuilder is created
+TEMPLATE_NAMES = (
+    "decomposition.j2",
+    "specialist-context.j2",
+    "conflict-resolution.j2",
+    "progress-synthesis.j2",
+)
+
+# Rendered prompts kept per builder for identical inputs (retries, fan-out)
+RENDER_CACHE_SIZE = int(os.environ.get("PROMPT_RENDER_CACHE_SIZE", "1024"))
+
+# Compiled template bytecode persisted across restarts; unset uses a private
+# per-user directory under the system temp dir, empty disables it
+BYTECODE_CACHE_DIR = os.environ.get("PROMPT_BYTECODE_CACHE_DIR")
+
+
+def _freeze(value: Any) -> Hashable:
+    """
+    Convert template inputs into a hashable cache key
+    
+    Containers and numbers are tagged with their type so that inputs which
+    compare equal but render differently (1 vs 1.0 vs True, a list of pairs
+    vs a dict) never share a key.
+    
+    Raises:
+        TypeError: If the value contains something unhashable and unknown
+    """
+    if value is None or type(value) is str:
+        return value
+    if type(value) in (int, float, bool):
+        return (type(value), value)
+    if isinstance(value, dict):
+        return (dict, tuple(sorted(((k, _freeze(v)) for k, v in value.items()), key=lambda item: item[0])))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_freeze(item) for item in value))
+    if is_dataclass(value):
+        cls: type = type(value)
+        return (cls, tuple(_freeze(getattr(value, name)) for name in _field_names(cls)))
+    frozen: Hashable = value
+    hash(frozen)
+    return frozen
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type) -> tuple:
+    """Field names of a dataclass type, looked up once per type"""
+    return tuple(field.name for field in fields(cls))
+
+
+def _bytecode_cache() -> Optional[BytecodeCache]:
+    """
+    On-disk bytecode cache for compiled templates, if one can be used
+    
+    Returns:
+        The bytecode cache, or None when disabled or the directory is unusable
+    """
+    if BYTECODE_CACHE_DIR == "":
+        return None
+    try:
+        if BYTECODE_CACHE_DIR is None:
+            return FileSystemBytecodeCache()
+        os.makedirs(BYTECODE_CACHE_DIR, exist_ok=True)
+        return FileSystemBytecodeCache(BYTECODE_CACHE_DIR)
+    except (OSError, RuntimeError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_environment(template_dir: str) -> Environment:
+    """
+    Shared Jinja2 environment for a template directory
+    
+    Templates are packaged and never change at runtime, so the environment
+    skips the per-lookup freshness check and keeps every compiled template.
+    Compiled bytecode is also kept on disk so restarted workers skip parsing.
+    """
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        autoescape=select_autoescape(disabled_extensions=('j2',)),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        auto_reload=False,
+        cache_size=-1,
+        bytecode_cache=_bytecode_cache()
+    )
+
+
 class PromptBuilder:
     """
     Builder for constructing prompts using Jinja2 templates
     """
     
-    def __init__(self, template_dir: str = None):
+    def __init__(self, template_dir: Optional[str] = None):
         """
-        Initialize the prompt builder with Jinja2 environment
+        Initialize the prompt builder and compile all templates up front
         
         Args:
             template_dir: Directory containing templates. Defaults to package templates directory.
         """
-        if template_dir is None:
-            # Use the templates directory in the package
-            package_dir = Path(__file__).parent
-            template_dir = package_dir / "templates"
+        self.env = get_environment(template_dir or DEFAULT_TEMPLATE_DIR)
+        self._templates: Dict[str, Template] = {}
+        for name in TEMPLATE_NAMES:
+            self._get(name)
+        self._render_cache: "OrderedDict[Hashable, str]" = OrderedDict()
+    
+    def _get(self, name: str) -> Template:
+        """
+        Return a compiled template, loading it on first use
         
-        self.env = Environment(
-            loader=FileSystemLoader(template_dir),
-            autoescape=select_autoescape(disabled_extensions=('j2',)),
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
+        Args:
+            name: Template file name relative to the template directory
+            
+        Returns:
+            The compiled Jinja2 template
+        """
+        template = self._templates.get(name)
+        if template is None:
+            template = self.env.get_template(name)
+            self._templates[name] = template
+        return template
+    
+    def _render(self, name: str, **context: Any) -> str:
+        """
+        Render a template, reusing the result for identical inputs
+        
+        Args:
+            name: Template file name
+            **context: Template variables
+            
+        Returns:
+            Rendered prompt string
+        """
+        try:
+            key = (name, _freeze(context))
+        except TypeError:
+            return self._get(name).render(**context)
+        
+        prompt = self._render_cache.get(key)
+        if prompt is not None:
+            self._render_cache.move_to_end(key)
+            return prompt
+        
+        prompt = self._get(name).render(**context)
+        self._render_cache[key] = prompt
+        if len(self._render_cache) > RENDER_CACHE_SIZE:
+            self._render_cache.popitem(last=False)
+        return prompt
     
     def build_decomposition_prompt(self, task: str, context: DecompositionContext) -> str:
         """
@@ -50,15 +182,11 @@ class PromptBuilder:
         Returns:
             Generated prompt string
         """
-        template = self.env.get_template("decomposition.j2")
-        
-        # Convert Pydantic models to dicts for template
-        specialists_data = [s.model_dump() for s in context.specialists]
-        
-        return template.render(
+        return self._render(
+            "decomposition.j2",
             task=task,
             priority=context.priority,
-            specialists=specialists_data,
+            specialists_rendered=context.specialists_rendered,
             constraints=context.constraints or []
         )
     
@@ -74,15 +202,14 @@ class PromptBuilder:
         Returns:
             Generated prompt string
         """
-        template = self.env.get_template("specialist-context.j2")
-        
         description = subtask.get('description', 'No description provided')
         dependencies = subtask.get('dependencies', [])
         constraints = subtask.get('context', {}).get('constraints', [])
         # Extract attachments from subtask data
         attachments = subtask.get('attachments', [])
         
-        return template.render(
+        return self._render(
+            "specialist-context.j2",
             subtaskId=subtaskId,
             specialist=specialist,
             description=description,
@@ -102,16 +229,12 @@ class PromptBuilder:
         Returns:
             Generated prompt string
         """
-        template = self.env.get_template("conflict-resolution.j2")
-        
-        # Convert Pydantic models to dicts for template
-        solutions_data = [s.model_dump() for s in solutions]
-        
-        return template.render(
+        return self._render(
+            "conflict-resolution.j2",
             projectType=context.projectType,
             requirements=context.requirements,
             constraints=context.constraints or [],
-            solutions=solutions_data
+            solutions=solutions
         )
     
     def build_synthesis_prompt(self, completedSubtasks: List[CompletedSubtask], parentTask: str) -> str:
@@ -125,12 +248,8 @@ class PromptBuilder:
         Returns:
             Generated prompt string
         """
-        template = self.env.get_template("progress-synthesis.j2")
-        
-        # Convert Pydantic models to dicts for template
-        subtasks_data = [st.model_dump() for st in completedSubtasks]
-        
-        return template.render(
+        return self._render(
+            "progress-synthesis.j2",
             parentTask=parentTask,
-            completedSubtasks=subtasks_data
+            completedSubtasks=completedSubtasks
         )
\ No newline at end of file
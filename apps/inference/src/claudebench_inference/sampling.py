@@ -2,14 +2,95 @@
 Sampling engine using claude-code-sdk
 """
 
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import itertools
 import json
+import os
 import re
+import sys
 import logging
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Set, Tuple
 from claude_code_sdk import query, ClaudeCodeOptions, AssistantMessage, TextBlock
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Micro-batching configuration
+BATCH_MAX_SIZE = int(os.environ.get("INFERENCE_BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = int(os.environ.get("INFERENCE_BATCH_MAX_WAIT_MS", "20"))
+
+# Maximum concurrent claude-code-sdk sessions; extra requests wait their turn
+MAX_CONCURRENCY = int(os.environ.get("INFERENCE_MAX_CONCURRENCY", "4"))
+
+# Response cache (disabled unless INFERENCE_CACHE_TTL > 0)
+CACHE_TTL_SECONDS = int(os.environ.get("INFERENCE_CACHE_TTL", "0"))
+CACHE_MAX_TEMPERATURE = 0.8  # Hotter samples are expected to vary, never cache them
+CACHE_KEY_PREFIX = "inf:"
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+# One pooled client per engine; bursts wait for a free connection instead of dialing new ones
+CACHE_MAX_CONNECTIONS = int(os.environ.get("INFERENCE_CACHE_MAX_CONNECTIONS", str(4 * MAX_CONCURRENCY)))
+CACHE_POOL_TIMEOUT_SECONDS = 1.0
+
+# System prompt used when neither the engine nor the caller supplies one
+DEFAULT_SYSTEM_PROMPT = sys.intern(
+    "You are an expert assistant helping with software architecture and task coordination. "
+    "Follow the instructions in the prompt carefully, including any specific format requirements."
+)
+
+# JSON extraction patterns
+_JSON_FENCE_RE = re.compile(r'```json\n?([\s\S]*?)\n?```')
+# Braces plus whole string literals, so braces inside strings are skipped
+_BRACE_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+# A brace that can open a JSON object (a key or an immediate close follows),
+# so braces in surrounding prose such as "{name}" are skipped
+_OBJECT_START_RE = re.compile(r'\{\s*["}]')
+
+# (prompt, max_tokens, temperature, system_prompt, max_turns, working_directory)
+SampleKey = Tuple[str, int, float, Optional[str], int, Optional[str]]
+
+
+def _resolve_waiters(futures: List[asyncio.Future], task: asyncio.Task) -> None:
+    """Hand a finished SDK call's outcome to every request waiting on it"""
+    for future in futures:
+        if future.done():
+            continue
+        if task.cancelled():
+            _fail_shutdown(future)
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+
+def _cancel_when_abandoned(task: asyncio.Task, futures: List[asyncio.Future]) -> None:
+    """Cancel an SDK call once every request waiting on it has been cancelled"""
+    def on_done(_: asyncio.Future) -> None:
+        if all(future.cancelled() for future in futures):
+            task.cancel()
+    
+    for future in futures:
+        future.add_done_callback(on_done)
+
+
+def _fail_shutdown(future: asyncio.Future) -> None:
+    """Fail a queued sampling request because the engine is shutting down"""
+    if not future.done():
+        future.set_exception(RuntimeError("Sampling engine is shutting down"))
+
 
 class SamplingEngine:
     """
@@ -23,10 +104,7 @@ class SamplingEngine:
         Args:
             system_prompt: Default system prompt to use
         """
-        self.default_system_prompt = system_prompt or (
-            "You are an expert assistant helping with software architecture and task coordination. "
-            "Follow the instructions in the prompt carefully, including any specific format requirements."
-        )
+        self.default_system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
         # Tools needed for codebase exploration as referenced in templates
         # Note: Only read-only tools for safe exploration
         self.allowed_tools = [
@@ -37,12 +115,161 @@ class SamplingEngine:
             "WebFetch",
             "WebSearch"
         ]
-        self.stats = {
-            "total_requests": 0,
-            "successful_requests": 0,
-            "failed_requests": 0,
-            "total_tokens": 0
-        }
+        # Options for the common call (default prompt, default turns, no cwd);
+        # other calls derive a copy from it. The SDK only reads options.
+        self._default_options = ClaudeCodeOptions(
+            max_turns=50,  # Allow multiple turns for exploration
+            system_prompt=self.default_system_prompt,
+            allowed_tools=self.allowed_tools,
+            permission_mode='bypassPermissions'  # Allow tool use without prompting
+        )
+        # Statistics are plain int attributes; dicts are only built on read
+        self._successful_requests = 0
+        self._failed_requests = 0
+        self._total_tokens = 0
+        self._coalesced_requests = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # Request counter; next() on itertools.count is a single C call
+        self._request_counter = itertools.count(1)
+        self._total_requests = 0
+        # Micro-batching state (populated by start())
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._inflight_batches: Set[asyncio.Task] = set()
+        # Concurrency limit on SDK sessions
+        self._sem = asyncio.Semaphore(MAX_CONCURRENCY)
+        self._waiting = 0
+        self._in_flight = 0
+        # Redis response cache (created by start() when enabled)
+        self._cache = None
+    
+    async def start(self) -> None:
+        """Start the background micro-batching consumer and the response cache"""
+        if self._batch_task is None:
+            self._queue = asyncio.Queue()
+            self._batch_task = asyncio.create_task(self._batch_loop())
+        
+        if CACHE_TTL_SECONDS > 0 and self._cache is None:
+            if REDIS_AVAILABLE:
+                pool = redis.BlockingConnectionPool.from_url(
+                    REDIS_URL,
+                    max_connections=CACHE_MAX_CONNECTIONS,
+                    timeout=CACHE_POOL_TIMEOUT_SECONDS,
+                    socket_keepalive=True,
+                    health_check_interval=30
+                )
+                # from_pool hands pool ownership to the client, so aclose() also disconnects it
+                self._cache = redis.Redis.from_pool(pool)
+                logger.info("Response cache enabled (ttl=%ss)", CACHE_TTL_SECONDS)
+            else:
+                logger.warning("INFERENCE_CACHE_TTL is set but the redis package is not installed; caching disabled")
+    
+    async def aclose(self) -> None:
+        """
+        Stop the micro-batching consumer and fail every request not yet answered
+        
+        Requests still queued, being collected into a batch or running in a
+        dispatched batch fail with RuntimeError; the response cache is closed
+        last, once nothing can write to it.
+        """
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            try:
+                await self._batch_task
+            except asyncio.CancelledError:
+                pass
+            self._batch_task = None
+            
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                _fail_shutdown(future)
+        
+        if self._inflight_batches:
+            for task in self._inflight_batches:
+                task.cancel()
+            await asyncio.gather(*self._inflight_batches, return_exceptions=True)
+        
+        if self._cache is not None:
+            await self._cache.aclose()
+            self._cache = None
+    
+    async def _batch_loop(self) -> None:
+        """
+        Drain queued sample_json calls in micro-batches
+        
+        Waits for the first request, then keeps collecting until either
+        BATCH_MAX_SIZE requests are queued or BATCH_MAX_WAIT_MS has elapsed.
+        The batch is dispatched in the background so collection of the next
+        batch is never blocked by a slow SDK call. Requests collected when
+        the loop is cancelled fail instead of waiting forever.
+        """
+        loop = asyncio.get_running_loop()
+        max_wait = BATCH_MAX_WAIT_MS / 1000
+        batch: List[Tuple[SampleKey, asyncio.Future]] = []
+        
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + max_wait
+                while len(batch) < BATCH_MAX_SIZE:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                
+                task = asyncio.create_task(self._run_batch(batch))
+                batch = []
+                self._inflight_batches.add(task)
+                task.add_done_callback(self._inflight_batches.discard)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                _fail_shutdown(future)
+            raise
+    
+    async def _run_batch(self, batch: List[Tuple[SampleKey, asyncio.Future]]) -> None:
+        """
+        Execute one micro-batch
+        
+        The SDK has no native batch API, so the requests run concurrently
+        and each is answered as soon as its own SDK call finishes. Identical
+        requests at temperature 0 are coalesced into a single SDK call; at
+        any other temperature each caller gets its own sample.
+        """
+        calls: List[Tuple[SampleKey, List[asyncio.Future]]] = []
+        shared: Dict[SampleKey, List[asyncio.Future]] = {}
+        for key, future in batch:
+            if key[2] == 0:  # temperature
+                futures = shared.get(key)
+                if futures is not None:
+                    futures.append(future)
+                    continue
+                futures = shared[key] = [future]
+            else:
+                futures = [future]
+            calls.append((key, futures))
+        
+        coalesced = len(batch) - len(calls)
+        if coalesced:
+            self._coalesced_requests += coalesced
+            logger.info("Coalesced %d duplicate sampling requests", coalesced)
+        
+        tasks = []
+        for key, futures in calls:
+            task = asyncio.ensure_future(self._sample_raw_direct(*key))
+            task.add_done_callback(functools.partial(_resolve_waiters, futures))
+            _cancel_when_abandoned(task, futures)
+            tasks.append(task)
+        
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                _fail_shutdown(future)
+            raise
     
     async def sample(
         self,
@@ -71,35 +298,137 @@ class SamplingEngine:
             Exception: If sampling fails
         """
         try:
-            self.stats["total_requests"] += 1
+            self._total_requests = next(self._request_counter)
+            
+            chunks: List[str] = []
+            async for text in self._query_text(prompt, system_prompt, max_turns, working_directory):
+                chunks.append(text)
+            response_text = "".join(chunks)
+            
+            self._successful_requests += 1
+            return response_text
+            
+        except Exception as e:
+            self._failed_requests += 1
+            logger.error("Sampling failed: %s", e)
+            raise Exception(f"Sampling failed: {str(e)}")
+    
+    async def sample_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 2000,  # Note: not directly used by SDK
+        temperature: float = 0.7,  # Note: not directly used by SDK
+        system_prompt: Optional[str] = None,
+        max_turns: int = 50,  # Allow extensive exploration
+        working_directory: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Perform sampling and yield response text as the SDK produces it
+        
+        Streams bypass micro-batching and the response cache but share the
+        concurrency limit with regular sampling.
+        
+        Args:
+            Same as sample
             
-            # Log the working directory if provided
-            if working_directory:
-                logger.info(f"Using working directory: {working_directory}")
+        Yields:
+            Text chunks of Claude's response, in order
             
-            options = ClaudeCodeOptions(
-                max_turns=max_turns,  # Allow multiple turns for exploration
+        Raises:
+            Exception: If sampling fails
+        """
+        async with self._sem:
+            self._in_flight += 1
+            try:
+                self._total_requests = next(self._request_counter)
+                async for text in self._query_text(prompt, system_prompt, max_turns, working_directory):
+                    yield text
+                self._successful_requests += 1
+            except Exception as e:
+                self._failed_requests += 1
+                logger.error("Sampling failed: %s", e)
+                raise Exception(f"Sampling failed: {str(e)}")
+            finally:
+                self._in_flight -= 1
+    
+    async def _query_text(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_turns: int,
+        working_directory: Optional[str]
+    ) -> AsyncIterator[str]:
+        """Run a claude-code-sdk query and yield the assistant's text blocks"""
+        # Log the working directory if provided
+        if working_directory:
+            logger.debug("Using working directory: %s", working_directory)
+        
+        options = self._default_options
+        if system_prompt or working_directory or max_turns != options.max_turns:
+            options = dataclasses.replace(
+                options,
+                max_turns=max_turns,
                 system_prompt=system_prompt or self.default_system_prompt,
-                allowed_tools=self.allowed_tools,
-                permission_mode='bypassPermissions',  # Allow tool use without prompting
                 cwd=working_directory  # Set the working directory for the SDK
             )
+        
+        async for message in query(prompt=prompt, options=options):
+            # Check if it's an AssistantMessage and extract text; exact type
+            # checks first, isinstance only for subclasses and other types
+            if type(message) is AssistantMessage or isinstance(message, AssistantMessage):
+                for block in message.content:
+                    if type(block) is TextBlock or isinstance(block, TextBlock):
+                        yield block.text
+    
+    def extract_json_text(self, response: str) -> str:
+        """
+        Locate the JSON document inside Claude's response
+        
+        Args:
+            response: The response text from Claude
             
-            response_text = ""
-            async for message in query(prompt=prompt, options=options):
-                # Check if it's an AssistantMessage and extract text
-                if isinstance(message, AssistantMessage):
-                    for block in message.content:
-                        if isinstance(block, TextBlock):
-                            response_text += block.text
-            
-            self.stats["successful_requests"] += 1
-            return response_text
+        Returns:
+            The JSON text, still unparsed
+        """
+        # Try to find JSON in markdown code block
+        json_match = _JSON_FENCE_RE.search(response)
+        if json_match:
+            return json_match.group(1)
+        
+        # Try to find raw JSON: the first brace that can open an object
+        object_start = _OBJECT_START_RE.search(response)
+        json_start = object_start.start() if object_start else response.find('{')
+        if json_start >= 0:
+            depth = 0
+            for brace in _BRACE_RE.finditer(response, json_start):
+                token = brace.group()
+                if token == '{':
+                    depth += 1
+                elif token == '}':
+                    depth -= 1
+                    if depth == 0:
+                        return response[json_start:brace.end()]
             
-        except Exception as e:
-            self.stats["failed_requests"] += 1
-            logger.error(f"Sampling failed: {str(e)}")
-            raise Exception(f"Sampling failed: {str(e)}")
+            # Unbalanced braces: fall back to the outermost closing brace
+            json_end = response.rfind('}') + 1
+            if json_end > json_start:
+                return response[json_start:json_end]
+        
+        # Fallback to entire response
+        return response.strip()
+    
+    def parse_json(self, json_str: str) -> Dict[str, Any]:
+        """
+        Parse JSON text previously located by extract_json_text
+        
+        Raises:
+            ValueError: If the text is not valid JSON
+        """
+        try:
+            return _loads(json_str)
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
+            logger.error("Failed to parse JSON from response: %.500s...", json_str)
+            raise ValueError(f"Invalid JSON in response: {str(e)}")
     
     def extract_json(self, response: str) -> Dict[str, Any]:
         """
@@ -114,25 +443,7 @@ class SamplingEngine:
         Raises:
             ValueError: If no valid JSON found
         """
-        # Try to find JSON in markdown code block
-        json_match = re.search(r'```json\n?([\s\S]*?)\n?```', response)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            # Try to find raw JSON (look for outermost braces)
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-            else:
-                # Fallback to entire response
-                json_str = response.strip()
-        
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON from response: {json_str[:500]}...")
-            raise ValueError(f"Invalid JSON in response: {str(e)}")
+        return self.parse_json(self.extract_json_text(response))
     
     async def sample_json(
         self,
@@ -160,18 +471,209 @@ class SamplingEngine:
         Raises:
             Exception: If sampling or parsing fails
         """
-        response = await self.sample(prompt, max_tokens, temperature, system_prompt, max_turns, working_directory)
-        return self.extract_json(response)
+        json_str = await self.sample_json_raw(prompt, max_tokens, temperature, system_prompt, max_turns, working_directory)
+        return self.parse_json(json_str)
+    
+    async def sample_json_raw(
+        self,
+        prompt: str,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        system_prompt: Optional[str] = None,
+        max_turns: int = 50,  # Allow extensive exploration
+        working_directory: Optional[str] = None
+    ) -> str:
+        """
+        Sample and return the unparsed JSON text of the response
+        
+        Lets callers decode straight into a typed model (e.g. with
+        model_validate_json) without an intermediate dict.
+        
+        Args:
+            Same as sample_json
+            
+        Returns:
+            JSON text located in the response
+        """
+        key = (prompt, max_tokens, temperature, system_prompt, max_turns, working_directory)
+        cache_key = None
+        if self._cache is not None and temperature <= CACHE_MAX_TEMPERATURE:
+            cache_key = CACHE_KEY_PREFIX + hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if self._batch_task is None:
+            # Batching not started (e.g. engine used standalone)
+            json_str = await self._sample_raw_direct(*key)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._queue.put_nowait((key, future))
+            json_str = await future
+        
+        if cache_key is not None:
+            await self._cache_set(cache_key, json_str)
+        return json_str
+    
+    async def sample_json_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        system_prompt: Optional[str] = None,
+        max_turns: int = 50,
+        working_directories: Optional[List[Optional[str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Sample several prompts concurrently and parse each JSON response
+        
+        Args:
+            Same as sample_json_raw_batch
+            
+        Returns:
+            Parsed JSON responses, in prompt order
+        """
+        results = await self.sample_json_raw_batch(prompts, max_tokens, temperature, system_prompt, max_turns, working_directories)
+        return [self.parse_json(json_str) for json_str in results]
+    
+    async def sample_json_raw_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        system_prompt: Optional[str] = None,
+        max_turns: int = 50,
+        working_directories: Optional[List[Optional[str]]] = None
+    ) -> List[str]:
+        """
+        Sample several prompts concurrently, returning the unparsed JSON texts
+        
+        All prompts go through sample_json_raw together, so they share one
+        micro-batch window, the response cache and the concurrency limit.
+        
+        Args:
+            prompts: Prompts to send to Claude
+            max_tokens: Maximum tokens in each response
+            temperature: Sampling temperature
+            system_prompt: Override the default system prompt
+            max_turns: Maximum number of turns for tool usage
+            working_directories: Per-prompt working directories (None for all defaults)
+            
+        Returns:
+            JSON texts, in prompt order
+            
+        Raises:
+            Exception: The first sampling failure in the batch; the prompts
+                still running are cancelled
+        """
+        if working_directories is None:
+            working_directories = [None] * len(prompts)
+        elif len(working_directories) != len(prompts):
+            raise ValueError("working_directories must match prompts in length")
+        
+        tasks = [
+            asyncio.ensure_future(
+                self.sample_json_raw(prompt, max_tokens, temperature, system_prompt, max_turns, working_directory)
+            )
+            for prompt, working_directory in zip(prompts, working_directories)
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+    
+    async def _cache_get(self, cache_key: str) -> Optional[str]:
+        """Look up a cached response; cache failures are treated as misses"""
+        try:
+            cached = await self._cache.get(cache_key)
+        except Exception as e:
+            logger.warning("Response cache lookup failed: %s", e)
+            cached = None
+        
+        if cached is None:
+            self._cache_misses += 1
+            return None
+        self._cache_hits += 1
+        return cached.decode()
+    
+    async def _cache_set(self, cache_key: str, json_str: str) -> None:
+        """Store a response that parses as JSON; cache failures are only logged"""
+        try:
+            _loads(json_str)
+        except json.JSONDecodeError:
+            return
+        
+        try:
+            await self._cache.setex(cache_key, CACHE_TTL_SECONDS, json_str)
+        except Exception as e:
+            logger.warning("Response cache store failed: %s", e)
+    
+    async def _sample_raw_direct(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: Optional[str],
+        max_turns: int,
+        working_directory: Optional[str]
+    ) -> str:
+        """Sample and locate the JSON text without going through the batch queue"""
+        self._waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self._waiting -= 1
+        
+        self._in_flight += 1
+        try:
+            response = await self.sample(prompt, max_tokens, temperature, system_prompt, max_turns, working_directory)
+        finally:
+            self._in_flight -= 1
+            self._sem.release()
+        return self.extract_json_text(response)
+    
+    @property
+    def total_requests(self) -> int:
+        """Number of SDK sampling calls made so far"""
+        return self._total_requests
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the request counters"""
+        return {
+            "successful_requests": self._successful_requests,
+            "failed_requests": self._failed_requests,
+            "total_tokens": self._total_tokens,
+            "coalesced_requests": self._coalesced_requests,
+            "cache_hits": self._cache_hits,
+            "cache_misses": self._cache_misses
+        }
     
     def get_stats(self) -> Dict[str, Any]:
         """Get sampling statistics"""
-        return self.stats.copy()
+        return {
+            "total_requests": self._total_requests,
+            "successful_requests": self._successful_requests,
+            "failed_requests": self._failed_requests,
+            "total_tokens": self._total_tokens,
+            "coalesced_requests": self._coalesced_requests,
+            "cache_hits": self._cache_hits,
+            "cache_misses": self._cache_misses,
+            "max_concurrency": MAX_CONCURRENCY,
+            "in_flight_requests": self._in_flight,
+            "waiting_requests": self._waiting,
+            "queued_requests": self._queue.qsize() if self._queue is not None else 0
+        }
     
     def reset_stats(self) -> None:
         """Reset sampling statistics"""
-        self.stats = {
-            "total_requests": 0,
-            "successful_requests": 0,
-            "failed_requests": 0,
-            "total_tokens": 0
-        }
\ No newline at end of file
+        self._request_counter = itertools.count(1)
+        self._total_requests = 0
+        self._successful_requests = 0
+        self._failed_requests = 0
+        self._total_tokens = 0
+        self._coalesced_requests = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
\ No newline at end of file
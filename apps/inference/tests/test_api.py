@@ -0,0 +1,13 @@
+"""
+Tests for request validation in the API
+"""
+
+from fastapi.testclient import TestClient
+
+from claudebench_inference.main import CONTEXT_BATCH_MAX_SIZE, app
+
+
+def test_context_batch_rejects_oversized_batches():
+    request = {"sessionId": "s", "subtaskId": "st-1", "specialist": "backend", "subtask": {}}
+    response = TestClient(app).post("/api/v1/context/batch", json=[request] * (CONTEXT_BATCH_MAX_SIZE + 1))
+    assert response.status_code == 422
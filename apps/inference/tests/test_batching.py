@@ -0,0 +1,87 @@
+"""
+Tests for micro-batching in the sampling engine
+"""
+
+import asyncio
+
+import pytest
+
+from claudebench_inference import sampling
+from claudebench_inference.sampling import SamplingEngine
+
+
+class FakeEngine(SamplingEngine):
+    """Sampling engine whose SDK call is a counted sleep; prompt "fail" raises"""
+    
+    def __init__(self, delay: float = 0):
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+    
+    async def _sample_raw_direct(self, prompt, *args):
+        self.calls += 1
+        call = self.calls
+        if prompt == "fail":
+            raise ValueError("sampling failed")
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f'{{"call": {call}}}'
+
+
+@pytest.mark.asyncio
+async def test_coalesces_identical_requests_only_at_temperature_zero():
+    engine = FakeEngine()
+    await engine.start()
+    try:
+        cold = await asyncio.gather(*(engine.sample_json_raw("p", temperature=0) for _ in range(3)))
+        hot = await asyncio.gather(*(engine.sample_json_raw("p", temperature=0.7) for _ in range(3)))
+    finally:
+        await engine.aclose()
+    
+    assert len(set(cold)) == 1
+    assert len(set(hot)) == 3
+    assert engine.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_aclose_fails_requests_being_collected(monkeypatch):
+    monkeypatch.setattr(sampling, "BATCH_MAX_WAIT_MS", 10_000)
+    engine = FakeEngine()
+    await engine.start()
+    request = asyncio.create_task(engine.sample_json_raw("p"))
+    await asyncio.sleep(0.01)
+    
+    await engine.aclose()
+    with pytest.raises(RuntimeError, match="shutting down"):
+        await asyncio.wait_for(request, 1)
+
+
+@pytest.mark.asyncio
+async def test_aclose_fails_requests_in_dispatched_batches():
+    engine = FakeEngine(delay=10)
+    await engine.start()
+    request = asyncio.create_task(engine.sample_json_raw("p"))
+    await asyncio.sleep(0.1)
+    assert engine.calls == 1
+    
+    await engine.aclose()
+    with pytest.raises(RuntimeError, match="shutting down"):
+        await asyncio.wait_for(request, 1)
+    assert not engine._inflight_batches
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_cancels_remaining_samples():
+    engine = FakeEngine(delay=10)
+    await engine.start()
+    try:
+        with pytest.raises(ValueError, match="sampling failed"):
+            await asyncio.wait_for(engine.sample_json_raw_batch(["slow", "fail"]), 1)
+        await asyncio.sleep(0.01)
+        assert engine.cancelled == 1
+    finally:
+        await engine.aclose()
@@ -0,0 +1,58 @@
+"""
+Tests for trusted construction of response models
+"""
+
+import pytest
+
+from claudebench_inference.models import (
+    DecompositionResponse,
+    SpecialistContextResponse,
+    construct_trusted
+)
+
+
+DECOMPOSITION = {
+    "subtasks": [{
+        "id": "st-1",
+        "description": "Build the form",
+        "specialist": "frontend",
+        "complexity": 3,
+        "context": {"files": [], "patterns": [], "constraints": []},
+        "estimatedMinutes": 30
+    }],
+    "executionStrategy": "parallel",
+    "totalComplexity": 3,
+    "reasoning": "One subtask"
+}
+
+
+def test_constructs_nested_models():
+    response = construct_trusted(DecompositionResponse, DECOMPOSITION)
+    assert response.subtasks[0].context.files == []
+    assert response.subtasks[0].specialist.value == "frontend"
+
+
+def test_rejects_non_object_for_model_field():
+    subtask = {**DECOMPOSITION["subtasks"][0], "context": "notadict"}
+    with pytest.raises(ValueError, match="SubtaskContext expects a JSON object"):
+        construct_trusted(DecompositionResponse, {**DECOMPOSITION, "subtasks": [subtask]})
+
+
+def test_rejects_non_object_list_item():
+    with pytest.raises(ValueError, match="Subtask expects a JSON object"):
+        construct_trusted(DecompositionResponse, {**DECOMPOSITION, "subtasks": ["notadict"]})
+
+
+def test_rejects_non_array_for_list_field():
+    with pytest.raises(ValueError, match="subtasks expects a JSON array"):
+        construct_trusted(DecompositionResponse, {**DECOMPOSITION, "subtasks": {"id": "st-1"}})
+
+
+def test_optional_model_field_may_be_null():
+    response = construct_trusted(SpecialistContextResponse, {
+        "taskId": "t-1",
+        "description": "d",
+        "scope": "s",
+        "discoveredPatterns": None
+    })
+    assert response.discoveredPatterns is None
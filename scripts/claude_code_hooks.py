@@ -13,11 +13,19 @@ Environment Variables:
     CLAUDE_PROJECT_DIR: Current project directory
     CLAUDEBENCH_TIMEOUT: Request timeout in seconds (default: 5)
     CLAUDEBENCH_DEBUG: Enable debug output (default: false)
+    CLAUDEBENCH_BATCH_MS: Coalesce non-blocking hooks into JSON-RPC batches sent
+        after this many milliseconds; 0 sends every hook immediately (default: 0)
+
+Usage:
+    Claude Code pipes each hook event to the script as JSON on stdin. Run it
+    with --interactive to type an event at a terminal instead.
 
 Exit Codes:
     0: Success - operation allowed/processed
     2: Blocking - operation blocked by hook (for pre_tool and user_prompt)
     1,3+: Non-blocking errors
+    Notification, Stop, SubagentStop, PreCompact and SessionEnd exit 0 at once and
+    send their request from a detached background process (unless debugging)
 
 Hook Types Supported:
     - PreToolUse -> hook.pre_tool
@@ -33,375 +41,688 @@ Hook Types Supported:
 
 import json
 import os
+import re
 import sys
+import tempfile
+import threading
 import time
-import urllib.request
-import urllib.error
+import http.client
+import urllib.parse
 import subprocess
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Optional, TextIO, Tuple, List
+
+try:
+    import fcntl
+except ImportError:  # No advisory locks (Windows): hook batching is unavailable
+    fcntl = None
+
+# JSON codec - use orjson when installed, otherwise the stdlib
+# (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def _pretty(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+except ImportError:
+    _loads = json.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    def _pretty(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+
+def _emit(obj: Any, stream: Optional[TextIO] = None) -> None:
+    """Write a JSON document and its newline to stdout (or stream) in one write"""
+    stream = stream or sys.stdout
+    stream.flush()
+    stream.buffer.write(_dumpb(obj) + b'\n')
+    stream.buffer.flush()
+
+
+# Values that switch on a boolean environment setting
+_TRUTHY = frozenset({'true', '1', 'yes'})
+
+# Tools whose successful use triggers a git auto-commit
+_CODE_CHANGING_TOOLS = frozenset({
+    'Edit', 'Write', 'MultiEdit', 'NotebookEdit',
+    'file.write', 'file.edit', 'file.multiedit',
+})
+
+# Branches never auto-committed to
+_PROTECTED_BRANCHES = frozenset({'main', 'master'})
+
+# Branch and changed files in one NUL-separated listing
+_GIT_STATUS_ARGS = ['status', '--porcelain=v2', '--branch', '-z']
+
+# Longest diff sent with an auto-commit notification
+_MAX_DIFF_CHARS = 10000
+
+# Summary line of `git diff --shortstat`
+_SHORTSTAT_RE = re.compile(r'(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?')
+
+# Environment settings - read once, they cannot change during a hook run
+_RPC_URL = os.environ.get('CLAUDEBENCH_RPC_URL', 'http://localhost:3000/rpc')
+_ENV_SESSION_ID = os.environ.get('CLAUDE_SESSION_ID')
+_ENV_PROJECT_DIR = os.environ.get('CLAUDE_PROJECT_DIR')
+_TIMEOUT = int(os.environ.get('CLAUDEBENCH_TIMEOUT', '5'))
+_DEBUG = os.environ.get('CLAUDEBENCH_DEBUG', '').lower() in _TRUTHY
+_ENV_INSTANCE_ID = os.environ.get('CLAUDE_INSTANCE_ID')
+_HAS_INSTANCE_ID = _ENV_INSTANCE_ID is not None
+_BATCH_MS = int(os.environ.get('CLAUDEBENCH_BATCH_MS', '0'))
+
+# Headers sent with every request
+_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json',
+    'User-Agent': 'claude-code-hook-bridge/1.0',
+}
+
+# Methods whose reply is neither printed nor able to block Claude Code
+# (post_tool's processed result is printed). The hook forks and leaves them
+# to a detached child; with CLAUDEBENCH_BATCH_MS set they are also spooled
+# per session and sent together to the batch endpoint.
+_UNANSWERED_METHODS = frozenset({
+    'hook.notification',
+    'hook.agent_stop',
+    'hook.pre_compact',
+    'system.unregister',
+})
+_SPOOL_NAME_RE = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+def _jsonrpc_request(method: str, params: Dict[str, Any], timestamp: Optional[int] = None) -> Dict[str, Any]:
+    """JSONRPC 2.0 request object, with an id taken from the event time in milliseconds"""
+    if timestamp is None:
+        timestamp = time.time_ns() // 1_000_000
+    return {
+        'jsonrpc': '2.0',
+        'method': method,
+        'params': params,
+        'id': timestamp % 100000  # Simple ID generation
+    }
+
+
+def _infer_event_type(claude_data: Dict[str, Any]) -> str:
+    """Event type of a payload without 'hook_event_name', from other fields or its shape"""
+    event_type = (
+        claude_data.get('event') or 
+        claude_data.get('event_type') or 
+        claude_data.get('type') or
+        claude_data.get('hook_type') or
+        ''
+    )
+    if event_type:
+        return event_type
+    
+    # Try to detect from the presence of specific fields
+    if 'tool_name' in claude_data and 'tool_input' in claude_data:
+        # Check if it's pre or post based on presence of result
+        if 'tool_result' in claude_data or 'result' in claude_data:
+            return 'PostToolUse'
+        return 'PreToolUse'
+    if 'prompt' in claude_data:
+        return 'UserPromptSubmit'
+    if 'session_id' in claude_data and 'action' in claude_data:
+        # Session events
+        action = claude_data.get('action', '')
+        if action == 'start':
+            return 'SessionStart'
+        if action == 'end':
+            return 'SessionEnd'
+        return ''
+    if 'notification' in claude_data:
+        return 'Notification'
+    return ''
 
 
 class ClaudeBenchHookBridge:
     """Bridge between Claude Code hooks and ClaudeBench JSONRPC endpoint"""
     
+    __slots__ = (
+        'rpc_url', 'session_id', 'project_dir', 'timeout', 'debug', 'instance_id',
+        '_connection_class', '_host', '_port', '_path', '_batch_path', '_conn', '_conn_used',
+    )
+    
     def __init__(self):
-        self.rpc_url = os.environ.get('CLAUDEBENCH_RPC_URL', 'http://localhost:3000/rpc')
-        self.session_id = os.environ.get('CLAUDE_SESSION_ID', f'claude-{int(time.time() * 1000)}')
-        self.project_dir = os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd())
-        self.timeout = int(os.environ.get('CLAUDEBENCH_TIMEOUT', '5'))
+        self.rpc_url = _RPC_URL
+        self.session_id = _ENV_SESSION_ID if _ENV_SESSION_ID is not None else f'claude-{time.time_ns() // 1_000_000}'
+        self.project_dir = _ENV_PROJECT_DIR if _ENV_PROJECT_DIR is not None else os.getcwd()
+        self.timeout = _TIMEOUT
         # Debug mode can be enabled via environment variable
-        self.debug = os.environ.get('CLAUDEBENCH_DEBUG', '').lower() in ('true', '1', 'yes')
+        self.debug = _DEBUG
         
         # Instance ID for this Claude Code session (will be updated from input data if available)
         # Use CLAUDE_INSTANCE_ID from environment if set, otherwise generate from session
-        self.instance_id = os.environ.get('CLAUDE_INSTANCE_ID', f"claude-code-{self.session_id[:8]}")
+        self.instance_id = _ENV_INSTANCE_ID if _HAS_INSTANCE_ID else f"claude-code-{self.session_id[:8]}"
+        
+        # Parse the RPC URL once; the connection is opened on first use and
+        # kept alive for every request this hook makes
+        url = urllib.parse.urlsplit(self.rpc_url)
+        self._connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self._host = url.hostname or 'localhost'
+        self._port = url.port
+        query = f'?{url.query}' if url.query else ''
+        self._path = (url.path or '/') + query
+        self._batch_path = url.path.rstrip('/') + '/batch' + query
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._conn_used = False
     
-    def debug_print(self, message: str):
-        """Print debug message to stderr if debug mode is enabled"""
+    def debug_print(self, message: str, *args: Any):
+        """
+        Print debug message to stderr if debug mode is enabled
+        
+        Extra args are %-formatted into the message only when debugging, so
+        callers can pass large values without paying for their formatting.
+        """
+        if self.debug:
+            print(f"[DEBUG] {message % args if args else message}", file=sys.stderr)
+    
+    def debug_json(self, label: str, obj: Any):
+        """Pretty-print a JSON document to stderr if debug mode is enabled"""
         if self.debug:
-            print(f"[DEBUG] {message}", file=sys.stderr)
+            print(f"[DEBUG] {label}: {_pretty(obj)}", file=sys.stderr)
     
     def transform_claude_to_claudebench(self, claude_data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
         """
         Transform Claude Code hook format to ClaudeBench JSONRPC format
         
-        Returns: (method_name, params_dict)
+        Returns: (method_name, jsonrpc_request)
         """
         # Debug: Log all available data
-        self.debug_print(f"Raw input keys: {list(claude_data.keys())}")
-        self.debug_print(f"Full input data: {json.dumps(claude_data, indent=2)}")
-        
-        # Extract event type - Claude Code uses 'hook_event_name' field
-        event_type = (
-            claude_data.get('hook_event_name') or  # Primary field used by Claude Code
-            claude_data.get('event') or 
-            claude_data.get('event_type') or 
-            claude_data.get('type') or
-            claude_data.get('hook_type') or
-            ''
-        )
-        
-        # If no event field, check if we have specific hook indicators
-        if not event_type:
-            # Try to detect from the presence of specific fields
-            if 'tool_name' in claude_data and 'tool_input' in claude_data:
-                # Check if it's pre or post based on presence of result
-                if 'tool_result' in claude_data or 'result' in claude_data:
-                    event_type = 'PostToolUse'
-                else:
-                    event_type = 'PreToolUse'
-            elif 'prompt' in claude_data:
-                event_type = 'UserPromptSubmit'
-            elif 'session_id' in claude_data and 'action' in claude_data:
-                # Session events
-                action = claude_data.get('action', '')
-                if action == 'start':
-                    event_type = 'SessionStart'
-                elif action == 'end':
-                    event_type = 'SessionEnd'
-            elif 'notification' in claude_data:
-                event_type = 'Notification'
-        
-        self.debug_print(f"Detected event type: '{event_type}'")
+        if self.debug:
+            self.debug_print("Raw input keys: %s", list(claude_data))
+            self.debug_json("Full input data", claude_data)
+        
+        # Claude Code names the event in 'hook_event_name'; older payloads need inferring
+        event_type = claude_data.get('hook_event_name') or _infer_event_type(claude_data)
+        
+        self.debug_print("Detected event type: '%s'", event_type)
         
         # Extract session_id from Claude Code input (overrides environment variable)
         if 'session_id' in claude_data:
             self.session_id = claude_data['session_id']
             # Only update instance_id if CLAUDE_INSTANCE_ID is not set in environment
-            if 'CLAUDE_INSTANCE_ID' not in os.environ:
+            if not _HAS_INSTANCE_ID:
                 self.instance_id = f"claude-code-{self.session_id[:8]}"
         
         # Extract common fields from Claude Code
         tool_name = claude_data.get('tool_name', '')
         tool_input = claude_data.get('tool_input', {})
-        tool_result = claude_data.get('tool_result', claude_data.get('tool_response', None))
-        cwd = claude_data.get('cwd', self.project_dir)
-        transcript_path = claude_data.get('transcript_path', '')
         
-        timestamp = int(time.time() * 1000)
+        timestamp = time.time_ns() // 1_000_000
         
         # Map Claude Code events to ClaudeBench methods
-        if event_type in ['PreToolUse', 'pre_tool']:
-            # Pre-tool validation
-            method = 'hook.pre_tool'
-            params = {
-                'tool': tool_name,
-                'params': tool_input,
-                'sessionId': self.session_id,
-                'instanceId': self.instance_id,
-                'timestamp': timestamp,
-                'metadata': {
-                    'projectDir': self.project_dir,
-                    'eventType': event_type
-                }
-            }
-            
-        elif event_type == 'PostToolUse' or (event_type == 'post_tool'):
-            # Special case for TodoWrite tool -> hook.todo_write
-            if tool_name == 'TodoWrite':
-                method = 'hook.todo_write'
-                params = {
-                    'todos': tool_input.get('todos', []),
-                    'sessionId': self.session_id,
-                    'instanceId': self.instance_id,
-                    'timestamp': timestamp
-                }
-                # Add previousTodos if available
-                if 'previousTodos' in claude_data:
-                    params['previousTodos'] = claude_data['previousTodos']
-            else:
-                # Regular post-tool processing
-                method = 'hook.post_tool'
-                params = {
-                    'tool': tool_name,
-                    'params': tool_input,
-                    'result': tool_result,
-                    'sessionId': self.session_id,
-                    'instanceId': self.instance_id,
-                    'timestamp': timestamp,
-                    'executionTime': claude_data.get('executionTime', 0),
-                    'success': claude_data.get('success', True)
-                }
-                
-        elif event_type in ['UserPromptSubmit', 'user_prompt']:
-            # User prompt interception
-            method = 'hook.user_prompt'
-            prompt_text = claude_data.get('prompt', '')
-            if isinstance(prompt_text, dict):
-                # Handle structured prompt format
-                prompt_text = prompt_text.get('text', str(prompt_text))
-            
-            params = {
-                'prompt': prompt_text,
-                'context': claude_data.get('context', {
-                    'projectPath': self.project_dir,
-                    'conversationId': claude_data.get('conversation_id'),
-                    'messageCount': claude_data.get('message_count', 0)
-                }),
-                'sessionId': self.session_id,
-                'instanceId': self.instance_id,
-                'timestamp': timestamp
-            }
-            
-        elif event_type in ['SessionStart', 'session_start']:
-            # Session start event
-            method = 'system.register'
-            params = {
-                'id': self.instance_id,
-                'roles': claude_data.get('roles', ['claude-code']),
-                'sessionId': self.session_id,
-                'timestamp': timestamp,
-                'metadata': {
-                    'projectDir': self.project_dir,
-                    'resumeFrom': claude_data.get('resume_from')
-                }
-            }
-            
-        elif event_type in ['SessionEnd', 'session_end']:
-            # Session end event
-            method = 'system.unregister'
-            params = {
-                'instanceId': self.instance_id,
-                'sessionId': self.session_id,
-                'timestamp': timestamp
-            }
-            
-        elif event_type in ['Stop', 'stop']:
-            # Main agent stop event
-            method = 'hook.agent_stop'
-            params = {
-                'instanceId': self.instance_id,
-                'sessionId': self.session_id,
-                'agentType': 'main',
-                'timestamp': timestamp
-            }
-            
-        elif event_type in ['SubagentStop', 'subagent_stop']:
-            # Subagent stop event
-            method = 'hook.agent_stop'
-            params = {
-                'instanceId': self.instance_id,
-                'sessionId': self.session_id,
-                'agentType': claude_data.get('subagent_type', 'unknown'),
-                'timestamp': timestamp
-            }
-            
-        elif event_type in ['Notification', 'notification']:
-            # Notification event
-            method = 'hook.notification'
-            params = {
-                'message': claude_data.get('message', ''),
-                'type': claude_data.get('notification_type', 'info'),
-                'sessionId': self.session_id,
-                'instanceId': self.instance_id,
-                'timestamp': timestamp
+        canonical = _EVENT_ALIASES.get(event_type, event_type)
+        handler = _EVENT_HANDLERS.get(canonical, ClaudeBenchHookBridge.handle_unknown)
+        method, params = handler(self, claude_data, event_type, tool_name, tool_input, timestamp)
+        return method, _jsonrpc_request(method, params, timestamp)
+    
+    def handle_pre_tool(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                        tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """Pre-tool validation"""
+        return 'hook.pre_tool', {
+            'tool': tool_name,
+            'params': tool_input,
+            'sessionId': self.session_id,
+            'instanceId': self.instance_id,
+            'timestamp': timestamp,
+            'metadata': {
+                'projectDir': self.project_dir,
+                'eventType': event_type
             }
-            
-        elif event_type in ['PreCompact', 'pre_compact']:
-            # Pre-compaction event
-            method = 'hook.pre_compact'
+        }
+    
+    def handle_post_tool(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                         tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """Post-tool processing (TodoWrite -> hook.todo_write)"""
+        # Special case for TodoWrite tool -> hook.todo_write
+        if tool_name == 'TodoWrite':
             params = {
+                'todos': tool_input.get('todos', []),
                 'sessionId': self.session_id,
                 'instanceId': self.instance_id,
-                'contextSize': claude_data.get('context_size', 0),
                 'timestamp': timestamp
             }
-            
+            # Add previousTodos if available
+            if 'previousTodos' in claude_data:
+                params['previousTodos'] = claude_data['previousTodos']
+            return 'hook.todo_write', params
+        
+        # Regular post-tool processing; newer Claude Code sends tool_response
+        if 'tool_result' in claude_data:
+            tool_result = claude_data['tool_result']
         else:
-            # Unknown event type - log it but don't fail
-            self.debug_print(f"Unknown event type: {event_type}, attempting generic handler")
-            method = f'hook.{event_type.lower().replace(" ", "_")}'
-            params = {
-                'data': claude_data,
-                'sessionId': self.session_id,
-                'instanceId': self.instance_id,
-                'timestamp': timestamp
+            tool_result = claude_data.get('tool_response')
+        return 'hook.post_tool', {
+            'tool': tool_name,
+            'params': tool_input,
+            'result': tool_result,
+            'sessionId': self.session_id,
+            'instanceId': self.instance_id,
+            'timestamp': timestamp,
+            'executionTime': claude_data.get('executionTime', 0),
+            'success': claude_data.get('success', True)
+        }
+    
+    def handle_user_prompt(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                           tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """User prompt interception"""
+        prompt_text = claude_data.get('prompt', '')
+        if isinstance(prompt_text, dict):
+            # Handle structured prompt format
+            prompt_text = prompt_text.get('text', str(prompt_text))
+        
+        return 'hook.user_prompt', {
+            'prompt': prompt_text,
+            'context': claude_data.get('context', {
+                'projectPath': self.project_dir,
+                'conversationId': claude_data.get('conversation_id'),
+                'messageCount': claude_data.get('message_count', 0)
+            }),
+            'sessionId': self.session_id,
+            'instanceId': self.instance_id,
+            'timestamp': timestamp
+        }
+    
+    def handle_session_start(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                             tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """Session start event"""
+        return 'system.register', {
+            'id': self.instance_id,
+            'roles': claude_data.get('roles', ['claude-code']),
+            'sessionId': self.session_id,
+            'timestamp': timestamp,
+            'metadata': {
+                'projectDir': self.project_dir,
+                'resumeFrom': claude_data.get('resume_from')
             }
+        }
+    
+    def handle_session_end(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                           tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """Session end event"""
+        return 'system.unregister', {
+            'instanceId': self.instance_id,
+            'sessionId': self.session_id,
+            'timestamp': timestamp
+        }
+    
+    def handle_stop(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                    tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """Main agent stop event"""
+        return 'hook.agent_stop', {
+            'instanceId': self.instance_id,
+            'sessionId': self.session_id,
+            'agentType': 'main',
+            'timestamp': timestamp
+        }
+    
+    def handle_subagent_stop(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                             tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """Subagent stop event"""
+        return 'hook.agent_stop', {
+            'instanceId': self.instance_id,
+            'sessionId': self.session_id,
+            'agentType': claude_data.get('subagent_type', 'unknown'),
+            'timestamp': timestamp
+        }
+    
+    def handle_notification(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                            tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """Notification event"""
+        return 'hook.notification', {
+            'message': claude_data.get('message', ''),
+            'type': claude_data.get('notification_type', 'info'),
+            'sessionId': self.session_id,
+            'instanceId': self.instance_id,
+            'timestamp': timestamp
+        }
+    
+    def handle_pre_compact(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                           tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """Pre-compaction event"""
+        return 'hook.pre_compact', {
+            'sessionId': self.session_id,
+            'instanceId': self.instance_id,
+            'contextSize': claude_data.get('context_size', 0),
+            'timestamp': timestamp
+        }
+    
+    def handle_unknown(self, claude_data: Dict[str, Any], event_type: str, tool_name: str,
+                       tool_input: Any, timestamp: int) -> Tuple[str, Dict[str, Any]]:
+        """Unknown event type - log it but don't fail"""
+        self.debug_print("Unknown event type: %s, attempting generic handler", event_type)
+        return f'hook.{event_type.lower().replace(" ", "_")}', {
+            'data': claude_data,
+            'sessionId': self.session_id,
+            'instanceId': self.instance_id,
+            'timestamp': timestamp
+        }
+    
+    def close(self):
+        """Close the kept-alive RPC connection, if any"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._conn_used = False
+    
+    def post(self, body: bytes, path: Optional[str] = None) -> Tuple[int, str, bytes]:
+        """
+        POST a request body over the kept-alive connection
         
-        return method, params
+        A connection that was already used may have been closed by the
+        server while idle; in that case the request is retried once on a
+        fresh connection.
+        
+        Returns: (status, reason, response_body)
+        """
+        path = path or self._path
+        reused = self._conn_used
+        try:
+            return self._post_once(body, path)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            if not reused:
+                raise
+            self.debug_print("Kept-alive connection was closed, reconnecting")
+            return self._post_once(body, path)
+    
+    def _post_once(self, body: bytes, path: str) -> Tuple[int, str, bytes]:
+        """Send one POST, opening the connection if needed and closing it on failure"""
+        if self._conn is None:
+            self._conn = self._connection_class(self._host, self._port, timeout=self.timeout)
+        try:
+            self._conn.request('POST', path, body=body, headers=_HEADERS)
+            response = self._conn.getresponse()
+            data = response.read()
+        except Exception:
+            self.close()
+            raise
+        
+        if response.will_close:
+            self.close()
+        else:
+            self._conn_used = True
+        return response.status, response.reason, data
     
-    def make_jsonrpc_request(self, method: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    def detach(self) -> bool:
         """
-        Make JSONRPC 2.0 request to ClaudeBench
+        Fork so the hook can exit before its request completes
+        
+        The child starts a new session and points stdio at /dev/null, so
+        Claude Code neither waits on it nor sees its output.
         
-        Returns: (response_data, exit_code)
+        Returns: True in the parent, False in the child or if forking failed
         """
-        # Build JSONRPC request
-        request_id = int(time.time() * 1000) % 100000  # Simple ID generation
-        jsonrpc_request = {
-            'jsonrpc': '2.0',
-            'method': method,
-            'params': params,
-            'id': request_id
-        }
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            pid = os.fork()
+        except OSError as e:
+            self.debug_print("Fork failed, sending synchronously: %s", e)
+            return False
+        if pid:
+            return True
         
-        self.debug_print(f"JSONRPC Request: {json.dumps(jsonrpc_request, indent=2)}")
+        os.setsid()
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+        os.close(devnull)
+        return False
+    
+    def request_jsonrpc(self, jsonrpc_request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Send a JSONRPC 2.0 request to ClaudeBench
         
-        # Prepare HTTP request
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json',
-            'User-Agent': 'claude-code-hook-bridge/1.0'
-        }
+        Returns: parsed response, or None if it could not be obtained
+        """
+        self.debug_json("JSONRPC Request", jsonrpc_request)
         
-        json_data = json.dumps(jsonrpc_request).encode('utf-8')
-        request = urllib.request.Request(
-            self.rpc_url,
-            data=json_data,
-            headers=headers,
-            method='POST'
-        )
+        json_data = _dumpb(jsonrpc_request)
         
         try:
-            # Make the request with timeout
-            with urllib.request.urlopen(request, timeout=self.timeout) as response:
-                response_data = response.read().decode('utf-8')
-                result = json.loads(response_data)
+            # Make the request over the kept-alive connection
+            status, reason, response_body = self.post(json_data)
+            if status >= 400:
+                self.debug_print("HTTP Error %s: %s", status, reason)
+                if response_body:
+                    self.debug_print("Response body: %s", response_body.decode('utf-8', 'replace'))
+                return None
+            
+            result = _loads(response_body)
+            
+        except (OSError, http.client.HTTPException) as e:
+            self.debug_print("Network Error: %s", e)
+            return None
+            
+        except json.JSONDecodeError as e:
+            self.debug_print("JSON Parse Error: %s", e)
+            return None
+        
+        self.debug_json("JSONRPC Response", result)
+        return result
+    
+    def make_jsonrpc_request(self, jsonrpc_request: Dict[str, Any]) -> int:
+        """
+        Make JSONRPC 2.0 request to ClaudeBench for a hook
+        
+        Returns: exit code
+        """
+        return self.hook_exit_code(jsonrpc_request['method'], self.request_jsonrpc(jsonrpc_request))
+    
+    def context_request(self) -> Dict[str, Any]:
+        """JSONRPC request for the task context of an auto-commit message"""
+        return _jsonrpc_request('git.context.get', {
+            'instanceId': self.instance_id,
+            'sessionId': self.session_id,
+        })
+    
+    def hook_exit_code(self, method: str, result: Optional[Dict[str, Any]]) -> int:
+        """
+        Print a hook's output from its JSONRPC response and pick its exit code
+        
+        Returns: exit code
+        """
+        try:
+            if result is None:
+                # HTTP, network and parse errors are non-blocking
+                return 1
+            
+            # Check for JSONRPC error
+            if 'error' in result:
+                error_code = result['error'].get('code', -32603)
+                error_msg = result['error'].get('message', 'Unknown error')
                 
-                self.debug_print(f"JSONRPC Response: {json.dumps(result, indent=2)}")
+                # Custom error code for hook blocking
+                if error_code == -32003:
+                    return 2  # Exit code 2 for blocking
                 
-                # Check for JSONRPC error
-                if 'error' in result:
-                    error_code = result['error'].get('code', -32603)
-                    error_msg = result['error'].get('message', 'Unknown error')
-                    
-                    # Custom error code for hook blocking
-                    if error_code == -32003:
-                        return result, 2  # Exit code 2 for blocking
-                    
-                    # Log error and return non-blocking error code
-                    print(json.dumps({
-                        'error': error_msg,
-                        'code': error_code
-                    }), file=sys.stderr)
-                    return result, 1
+                # Log error and return non-blocking error code
+                _emit({
+                    'error': error_msg,
+                    'code': error_code
+                }, sys.stderr)
+                return 1
+            
+            # Process successful response
+            if 'result' in result:
+                response_result = result['result']
                 
-                # Process successful response
-                if 'result' in result:
-                    response_result = result['result']
-                    
-                    # Check for blocking conditions
-                    if method == 'hook.pre_tool':
-                        if not response_result.get('allow', True):
-                            # Tool blocked
-                            reason = response_result.get('reason', 'Blocked by hook')
-                            print(json.dumps({
-                                'blocked': True,
-                                'reason': reason,
-                                'metadata': response_result.get('metadata')
-                            }))
-                            return result, 2  # Exit code 2 for blocking
-                        
-                        # Check for parameter modification
-                        if 'modified' in response_result:
-                            print(json.dumps({
-                                'modified': response_result['modified'],
-                                'warnings': response_result.get('warnings', [])
-                            }))
-                    
-                    elif method == 'hook.user_prompt':
-                        if not response_result.get('continue', True):
-                            # Prompt blocked
-                            reason = response_result.get('reason', 'Blocked by hook')
-                            print(json.dumps({
-                                'blocked': True,
-                                'reason': reason
-                            }))
-                            return result, 2  # Exit code 2 for blocking
-                        
-                        # Check for prompt modification or added context
-                        output = {}
-                        if 'modified' in response_result:
-                            output['modified'] = response_result['modified']
-                        if 'addedContext' in response_result:
-                            output['addedContext'] = response_result['addedContext']
-                        if output:
-                            print(json.dumps(output))
-                    
-                    elif method == 'hook.post_tool':
-                        # Pass through processed result
-                        if 'processed' in response_result:
-                            print(json.dumps({
-                                'processed': response_result['processed'],
-                                'notifications': response_result.get('notifications', [])
-                            }))
+                # Check for blocking conditions
+                if method == 'hook.pre_tool':
+                    if not response_result.get('allow', True):
+                        # Tool blocked
+                        reason = response_result.get('reason', 'Blocked by hook')
+                        _emit({
+                            'blocked': True,
+                            'reason': reason,
+                            'metadata': response_result.get('metadata')
+                        })
+                        return 2  # Exit code 2 for blocking
                     
-                    elif method == 'hook.todo_write':
-                        # Pass through summary
-                        if response_result.get('processed'):
-                            summary = response_result.get('summary', {})
-                            print(json.dumps({
-                                'processed': True,
-                                'summary': summary
-                            }))
+                    # Check for parameter modification
+                    if 'modified' in response_result:
+                        _emit({
+                            'modified': response_result['modified'],
+                            'warnings': response_result.get('warnings', [])
+                        })
+                
+                elif method == 'hook.user_prompt':
+                    if not response_result.get('continue', True):
+                        # Prompt blocked
+                        reason = response_result.get('reason', 'Blocked by hook')
+                        _emit({
+                            'blocked': True,
+                            'reason': reason
+                        })
+                        return 2  # Exit code 2 for blocking
                     
-                    return result, 0  # Success
+                    # Check for prompt modification or added context
+                    output = {}
+                    if 'modified' in response_result:
+                        output['modified'] = response_result['modified']
+                    if 'addedContext' in response_result:
+                        output['addedContext'] = response_result['addedContext']
+                    if output:
+                        _emit(output)
+                
+                elif method == 'hook.post_tool':
+                    # Pass through processed result
+                    if 'processed' in response_result:
+                        _emit({
+                            'processed': response_result['processed'],
+                            'notifications': response_result.get('notifications', [])
+                        })
                 
-                # Malformed response
-                self.debug_print(f"Malformed JSONRPC response: {result}")
-                return result, 1
+                elif method == 'hook.todo_write':
+                    # Pass through summary
+                    if response_result.get('processed'):
+                        summary = response_result.get('summary', {})
+                        _emit({
+                            'processed': True,
+                            'summary': summary
+                        })
                 
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8') if e.fp else ''
-            self.debug_print(f"HTTP Error {e.code}: {e.reason}")
-            if error_body:
-                self.debug_print(f"Response body: {error_body}")
+                return 0  # Success
             
-            # Network errors are non-blocking
-            return {'error': f'HTTP {e.code}: {e.reason}'}, 1
+            # Malformed response
+            self.debug_print("Malformed JSONRPC response: %s", result)
+            return 1
             
-        except urllib.error.URLError as e:
-            self.debug_print(f"Network Error: {e.reason}")
-            # Network errors are non-blocking  
-            return {'error': f'Network error: {str(e.reason)}'}, 1
+        except (AttributeError, TypeError, KeyError) as e:
+            # A response of the wrong shape, e.g. a non-object error or result
+            self.debug_print("Malformed JSONRPC response: %s", e)
+            return 1
+    
+    def spool_path(self) -> str:
+        """Per-user, per-session file collecting batched hook requests"""
+        session = _SPOOL_NAME_RE.sub('_', self.session_id)
+        return os.path.join(tempfile.gettempdir(), f'claudebench-hooks-{os.getuid()}-{session}.spool')
+    
+    def spool_jsonrpc_request(self, jsonrpc_request: Dict[str, Any], timestamp: int) -> int:
+        """
+        Queue a non-blocking JSONRPC request for a batched send
+        
+        A hook that finds no batch leader for the session becomes the leader:
+        it holds the session's leader lock, waits CLAUDEBENCH_BATCH_MS, then
+        sends everything queued meanwhile as one JSONRPC batch and reports
+        its own response. Hooks that find a leader only append and return 0
+        without learning their result. The kernel drops the leader lock of a
+        hook that dies, so its queued requests go out with the next hook's
+        batch.
+        
+        Returns: exit code
+        """
+        # Ids only need to be unique within a batch
+        method = jsonrpc_request['method']
+        request_id = jsonrpc_request['id'] = f'{os.getpid()}-{timestamp}'
+        line = _dumpb(jsonrpc_request) + b'\n'
+        path = self.spool_path()
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0)
+        
+        fd = os.open(path, flags | os.O_APPEND, 0o600)
+        leader_fd = os.open(f'{path}.lock', flags, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, line)
+            try:
+                fcntl.flock(leader_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                self.debug_print("Queued %s for the pending batch", method)
+                return 0
+            fcntl.flock(fd, fcntl.LOCK_UN)
             
-        except json.JSONDecodeError as e:
-            self.debug_print(f"JSON Parse Error: {e}")
-            return {'error': f'Invalid JSON response: {str(e)}'}, 1
+            time.sleep(_BATCH_MS / 1000)
             
-        except Exception as e:
-            self.debug_print(f"Unexpected Error: {e}")
-            return {'error': f'Unexpected error: {str(e)}'}, 1
+            # Give up leadership only once the spool is drained, so a hook
+            # appending afterwards leads the next batch
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.lseek(fd, 0, os.SEEK_SET)
+            chunks = []
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            os.ftruncate(fd, 0)
+            fcntl.flock(leader_fd, fcntl.LOCK_UN)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(leader_fd)
+            os.close(fd)
+        
+        batch = []
+        for raw in b''.join(chunks).splitlines():
+            try:
+                batch.append(_loads(raw))
+            except json.JSONDecodeError:
+                self.debug_print("Dropping unreadable spooled request")
+        return self.send_jsonrpc_batch(batch, method, request_id)
+    
+    def send_jsonrpc_batch(self, batch: List[Dict[str, Any]], own_method: str, own_id: str) -> int:
+        """
+        Send spooled requests as one JSONRPC 2.0 batch
+        
+        The response for own_id is handled like the reply to an unbatched
+        request of own_method.
+        
+        Returns: exit code for the request with own_id
+        """
+        self.debug_print("Sending JSONRPC batch of %d requests", len(batch))
+        try:
+            status, reason, response_body = self.post(_dumpb(batch), self._batch_path)
+            if status >= 400:
+                self.debug_print("HTTP Error %s: %s", status, reason)
+                return 1
+            responses = _loads(response_body)
+        except (OSError, http.client.HTTPException) as e:
+            self.debug_print("Network Error: %s", e)
+            return 1
+        except json.JSONDecodeError as e:
+            self.debug_print("JSON Parse Error: %s", e)
+            return 1
+        
+        if not isinstance(responses, list):
+            self.debug_print("Malformed JSONRPC batch response: %s", responses)
+            return 1
+        
+        own_response = None
+        for response in responses:
+            if not isinstance(response, dict):
+                continue
+            if response.get('id') == own_id:
+                own_response = response
+            elif 'error' in response:
+                self.debug_print("Batched request %s failed: %s", response.get('id'), response['error'])
+        return self.hook_exit_code(own_method, own_response)
     
     def run_git_command(self, args: List[str]) -> Tuple[bool, str]:
         """
@@ -409,46 +730,145 @@ class ClaudeBenchHookBridge:
         
         Returns: (success, output)
         """
+        return self.run_git_commands(args)[0]
+    
+    def run_git_commands(self, *commands: List[str]) -> List[Tuple[bool, str]]:
+        """
+        Run independent git commands concurrently
+        
+        Returns: (success, output) for each command, in order
+        """
+        deadline = time.monotonic() + 5
+        processes = [self.start_git_command(args) for args in commands]
+        return [self.finish_git_command(args, process, deadline)
+                for args, process in zip(commands, processes)]
+    
+    def start_git_command(self, args: List[str]) -> Any:
+        """
+        Start a git command without waiting for it
+        
+        Returns: the running process, or the error message if it could not start
+        """
         try:
-            result = subprocess.run(
+            return subprocess.Popen(
                 ['git'] + args,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                cwd=self.project_dir,
-                timeout=5
+                cwd=self.project_dir
             )
-            return result.returncode == 0, result.stdout.strip()
+        except (OSError, ValueError) as e:
+            self.debug_print("Git command failed: %s", e)
+            return str(e)
+    
+    def finish_git_command(self, args: List[str], process: Any, deadline: float,
+                           limit: Optional[int] = None) -> Tuple[bool, str]:
+        """
+        Wait for a git command started by start_git_command
+        
+        Args:
+            deadline: time.monotonic() value after which the command is killed
+            limit: Read at most this many characters, then stop the command
+        
+        Returns: (success, output)
+        """
+        if isinstance(process, str):
+            return False, process
+        if limit is not None:
+            return self.finish_git_command_head(args, process, deadline, limit)
+        try:
+            stdout, _ = process.communicate(timeout=max(deadline - time.monotonic(), 0))
+            return process.returncode == 0, stdout.strip()
         except subprocess.TimeoutExpired:
-            self.debug_print(f"Git command timed out: {args}")
+            process.kill()
+            process.communicate()
+            self.debug_print("Git command timed out: %s", args)
             return False, "Command timed out"
-        except Exception as e:
-            self.debug_print(f"Git command failed: {e}")
+        except (OSError, ValueError) as e:
+            # ValueError covers output that is not valid UTF-8
+            process.kill()
+            self.debug_print("Git command failed: %s", e)
             return False, str(e)
     
-    def check_for_changes(self) -> Tuple[bool, List[str]]:
+    def finish_git_command_head(self, args: List[str], process: Any, deadline: float,
+                                limit: int) -> Tuple[bool, str]:
         """
-        Check if there are any git changes
+        Read the first limit characters of a git command's output and stop it
         
-        Returns: (has_changes, list_of_changed_files)
+        Output past the limit is never read into memory; the command is
+        killed instead of being drained.
+        
+        Returns: (success, output)
         """
-        # Check git status
-        success, output = self.run_git_command(['status', '--porcelain'])
-        if not success:
-            return False, []
+        timed_out = threading.Event()
+        
+        def kill_on_deadline() -> None:
+            timed_out.set()
+            process.kill()
         
-        if not output:
-            return False, []
+        killer = threading.Timer(max(deadline - time.monotonic(), 0), kill_on_deadline)
+        killer.start()
+        try:
+            output = process.stdout.read(limit)
+            truncated = len(output) == limit and process.poll() is None
+            if truncated:
+                process.kill()
+            process.communicate()
+        except (OSError, ValueError) as e:
+            # ValueError covers output that is not valid UTF-8
+            process.kill()
+            process.communicate()
+            self.debug_print("Git command failed: %s", e)
+            return False, str(e)
+        finally:
+            killer.cancel()
         
-        # Parse changed files
+        if timed_out.is_set():
+            self.debug_print("Git command timed out: %s", args)
+            return False, "Command timed out"
+        return truncated or process.returncode == 0, output.strip()
+    
+    def get_status_and_branch(self) -> Tuple[str, List[str]]:
+        """
+        Get the current branch and changed files from a single `git status`
+        
+        Returns: (branch, list_of_changed_files)
+        """
+        return self.parse_status_and_branch(*self.run_git_command(_GIT_STATUS_ARGS))
+    
+    def parse_status_and_branch(self, success: bool, output: str) -> Tuple[str, List[str]]:
+        """
+        Parse `git status --porcelain=v2 --branch -z` output
+        
+        Returns: (branch, list_of_changed_files)
+        """
+        if not success:
+            return "unknown", []
+        
+        # NUL-separated entries: "# branch.head <name>" headers, then
+        # "1 XY ... path" (changed), "2 XY ... path" followed by the original
+        # path (renamed/copied), "u XY ... path" (unmerged) and "? path"
+        branch = "unknown"
         changed_files = []
-        for line in output.split('\n'):
-            if line.strip():
-                # Status format: "XY filename" where X is staged, Y is unstaged
-                parts = line.strip().split(None, 1)
-                if len(parts) >= 2:
-                    changed_files.append(parts[1])
+        entries = iter(output.split('\0'))
+        for entry in entries:
+            kind = entry[:1]
+            if kind == '#':
+                if entry.startswith('# branch.head '):
+                    branch = entry[14:]
+                    if branch == '(detached)':
+                        branch = 'HEAD'
+            elif kind == '1':
+                changed_files.append(entry.split(' ', 8)[8])
+            elif kind == '2':
+                changed_files.append(entry.split(' ', 9)[9])
+                next(entries, None)
+            elif kind == 'u':
+                changed_files.append(entry.split(' ', 10)[10])
+            elif kind == '?':
+                changed_files.append(entry[2:])
         
-        return len(changed_files) > 0, changed_files
+        return branch, changed_files
     
     def get_git_diff(self) -> str:
         """Get git diff for all changes"""
@@ -457,72 +877,60 @@ class ClaudeBenchHookBridge:
     
     def get_git_stats(self) -> Dict[str, int]:
         """Get statistics about changes"""
-        success, output = self.run_git_command(['diff', '--stat', 'HEAD'])
+        return self.parse_stats(*self.run_git_command(['diff', '--shortstat', 'HEAD']))
+    
+    def parse_stats(self, success: bool, output: str) -> Dict[str, int]:
+        """Parse `git diff --shortstat` output into change statistics"""
         if not success:
             return {'additions': 0, 'deletions': 0, 'filesChanged': 0}
         
-        # Parse the last line for stats (e.g., "3 files changed, 10 insertions(+), 2 deletions(-)")
-        lines = output.split('\n')
-        if lines:
-            last_line = lines[-1].strip()
-            stats = {'additions': 0, 'deletions': 0, 'filesChanged': 0}
-            
-            # Extract numbers
-            import re
-            files_match = re.search(r'(\d+) file', last_line)
-            if files_match:
-                stats['filesChanged'] = int(files_match.group(1))
-            
-            insertions_match = re.search(r'(\d+) insertion', last_line)
-            if insertions_match:
-                stats['additions'] = int(insertions_match.group(1))
-            
-            deletions_match = re.search(r'(\d+) deletion', last_line)
-            if deletions_match:
-                stats['deletions'] = int(deletions_match.group(1))
-            
-            return stats
+        # e.g. "3 files changed, 10 insertions(+), 2 deletions(-)"
+        match = _SHORTSTAT_RE.search(output)
+        if not match:
+            return {'additions': 0, 'deletions': 0, 'filesChanged': 0}
         
-        return {'additions': 0, 'deletions': 0, 'filesChanged': 0}
-    
-    def get_current_branch(self) -> str:
-        """Get current git branch"""
-        success, branch = self.run_git_command(['rev-parse', '--abbrev-ref', 'HEAD'])
-        return branch if success else "unknown"
+        files, insertions, deletions = match.groups()
+        return {
+            'additions': int(insertions or 0),
+            'deletions': int(deletions or 0),
+            'filesChanged': int(files),
+        }
     
-    def handle_git_auto_commit(self, tool_name: str) -> Optional[str]:
+    def check_auto_commit(self, tool_name: str, status_result: Tuple[bool, str]) -> Optional[Tuple[str, List[str]]]:
         """
-        Handle git auto-commit for code-changing tools
+        Check whether a code-changing tool left changes that should be auto-committed
         
-        Returns: commit hash if committed, None otherwise
-        """
-        # Only process for code-changing tools
-        CODE_CHANGING_TOOLS = ['Edit', 'Write', 'MultiEdit', 'NotebookEdit', 
-                               'file.write', 'file.edit', 'file.multiedit']
+        Args:
+            status_result: (success, output) of the _GIT_STATUS_ARGS command
         
-        if tool_name not in CODE_CHANGING_TOOLS:
-            return None
+        Returns: (branch, changed_files) if so, None otherwise
+        """
+        branch, changed_files = self.parse_status_and_branch(*status_result)
         
         # Check current branch - disable autocommit on main/master
-        branch = self.get_current_branch()
-        if branch.lower() in ['main', 'master']:
-            self.debug_print(f"Autocommit disabled on protected branch: {branch}")
+        if branch.lower() in _PROTECTED_BRANCHES:
+            self.debug_print("Autocommit disabled on protected branch: %s", branch)
             return None
         
         # Check for changes
-        has_changes, changed_files = self.check_for_changes()
-        if not has_changes:
-            self.debug_print(f"No git changes after {tool_name}")
+        if not changed_files:
+            self.debug_print("No git changes after %s", tool_name)
             return None
         
-        self.debug_print(f"Git changes detected after {tool_name}: {changed_files}")
+        self.debug_print("Git changes detected after %s: %s", tool_name, changed_files)
+        return branch, changed_files
+    
+    def handle_git_auto_commit(self, tool_name: str, branch: str, changed_files: List[str],
+                               context_response: Optional[Dict[str, Any]], timestamp: int) -> Optional[str]:
+        """
+        Handle git auto-commit for code-changing tools
         
-        # Get task context from ClaudeBench
-        context_response, _ = self.make_jsonrpc_request('git.context.get', {
-            'instanceId': self.instance_id,
-            'sessionId': self.session_id,
-        })
+        Args:
+            context_response: Response to git.context.get
+            timestamp: Time of the hook event in milliseconds
         
+        Returns: commit hash if committed, None otherwise
+        """
         task_context = {
             'tasks': [],
             'recentTools': [],
@@ -541,13 +949,13 @@ class ClaudeBenchHookBridge:
             'todos': [{'content': t['content'], 'status': t['status']} for t in task_context.get('currentTodos', [])],
             'sessionId': self.session_id,
             'instanceId': self.instance_id,
-            'timestamp': int(time.time() * 1000),
+            'timestamp': timestamp,
         }
         
         if task_context.get('lastPrompt'):
             commit_data['prompt'] = task_context['lastPrompt'][:200]  # Truncate long prompts
         
-        commit_message = json.dumps(commit_data, indent=2)
+        commit_message = _pretty(commit_data)
         
         # Stage all changes
         success, _ = self.run_git_command(['add', '-A'])
@@ -555,15 +963,22 @@ class ClaudeBenchHookBridge:
             self.debug_print("Failed to stage changes")
             return None
         
-        # Get diff and stats before committing
-        diff = self.get_git_diff()
-        stats = self.get_git_stats()
-        # Branch already retrieved at the beginning of the method
+        # Get diff and stats before committing; only the head of the diff is sent
+        diff_args = ['diff', 'HEAD']
+        stats_args = ['diff', '--shortstat', 'HEAD']
+        deadline = time.monotonic() + 5
+        diff_process = self.start_git_command(diff_args)
+        stats_process = self.start_git_command(stats_args)
+        diff_success, diff = self.finish_git_command(diff_args, diff_process, deadline, _MAX_DIFF_CHARS)
+        if not diff_success:
+            diff = ""
+        stats = self.parse_stats(*self.finish_git_command(stats_args, stats_process, deadline))
+        # Branch already retrieved by check_auto_commit
         
         # Create commit
         success, output = self.run_git_command(['commit', '-m', commit_message])
         if not success:
-            self.debug_print(f"Failed to commit: {output}")
+            self.debug_print("Failed to commit: %s", output)
             return None
         
         # Extract commit hash from output
@@ -583,29 +998,29 @@ class ClaudeBenchHookBridge:
                 commit_hash = hash_output.strip()
         
         if commit_hash:
-            self.debug_print(f"Auto-committed: {commit_hash[:7]}")
+            self.debug_print("Auto-committed: %s", commit_hash[:7])
             
             # Notify ClaudeBench about the commit
             task_ids = [t['id'] for t in task_context.get('tasks', [])]
             
-            self.make_jsonrpc_request('git.auto_commit.notify', {
+            self.make_jsonrpc_request(_jsonrpc_request('git.auto_commit.notify', {
                 'instanceId': self.instance_id,
                 'sessionId': self.session_id,
                 'commitHash': commit_hash,
                 'branch': branch,
                 'files': changed_files,
-                'diff': diff[:10000],  # Limit diff size
+                'diff': diff,
                 'stats': stats,
                 'taskContext': {
                     'taskIds': task_ids,
                     'toolUsed': tool_name,
-                    'timestamp': int(time.time() * 1000),
+                    'timestamp': timestamp,
                 },
                 'commitMessage': commit_message,
-            })
+            }))
             
             # Output git info for the user to see
-            print(json.dumps({
+            _emit({
                 'git_auto_commit': {
                     'hash': commit_hash[:7],
                     'branch': branch,
@@ -613,11 +1028,11 @@ class ClaudeBenchHookBridge:
                     'tasks': len(task_ids),
                     'message': 'Changes auto-committed with task context'
                 }
-            }))
+            })
         
         return commit_hash
     
-    def process_hook(self, input_data: str) -> int:
+    def process_hook(self, input_data: bytes) -> int:
         """
         Process a hook event from Claude Code
         
@@ -625,86 +1040,127 @@ class ClaudeBenchHookBridge:
         """
         try:
             # Parse input JSON
-            claude_data = json.loads(input_data)
-            self.debug_print(f"Input data: {json.dumps(claude_data, indent=2)}")
+            claude_data = _loads(input_data)
+            self.debug_json("Input data", claude_data)
             
             # Transform to ClaudeBench format
-            method, params = self.transform_claude_to_claudebench(claude_data)
+            method, jsonrpc_request = self.transform_claude_to_claudebench(claude_data)
+            params = jsonrpc_request['params']
             
-            # Make JSONRPC request
-            response, exit_code = self.make_jsonrpc_request(method, params)
+            # Make JSONRPC request, batched with other non-blocking hooks if enabled
+            # Requests nobody waits for are sent from a detached child
+            if method in _UNANSWERED_METHODS and not self.debug and hasattr(os, 'fork'):
+                if self.detach():
+                    return 0
             
-            # Handle git auto-commit for PostToolUse events
-            if method == 'hook.post_tool':
-                tool_name = params.get('tool', '')
-                self.handle_git_auto_commit(tool_name)
+            # PostToolUse of a code-changing tool may auto-commit: git status
+            # runs while the hook request is in flight; the task context for
+            # the commit message is only fetched once a commit will be made
+            tool_name = params.get('tool', '') if method == 'hook.post_tool' else ''
+            git_status = None
+            if tool_name in _CODE_CHANGING_TOOLS:
+                git_deadline = time.monotonic() + 5
+                git_status = self.start_git_command(_GIT_STATUS_ARGS)
+            
+            if _BATCH_MS > 0 and fcntl is not None and method in _UNANSWERED_METHODS:
+                exit_code = self.spool_jsonrpc_request(jsonrpc_request, params['timestamp'])
+            else:
+                exit_code = self.make_jsonrpc_request(jsonrpc_request)
+            
+            if git_status is not None:
+                status_result = self.finish_git_command(_GIT_STATUS_ARGS, git_status, git_deadline)
+                auto_commit = self.check_auto_commit(tool_name, status_result)
+                if auto_commit is not None:
+                    context_response = self.request_jsonrpc(self.context_request())
+                    self.handle_git_auto_commit(tool_name, *auto_commit, context_response, params['timestamp'])
             
             return exit_code
             
         except json.JSONDecodeError as e:
-            print(json.dumps({
+            _emit({
                 'error': f'Invalid input JSON: {str(e)}'
-            }), file=sys.stderr)
+            }, sys.stderr)
             return 1
             
         except ValueError as e:
-            print(json.dumps({
+            _emit({
                 'error': str(e)
-            }), file=sys.stderr)
+            }, sys.stderr)
             return 1
             
         except Exception as e:
-            print(json.dumps({
+            _emit({
                 'error': f'Bridge error: {str(e)}'
-            }), file=sys.stderr)
+            }, sys.stderr)
             return 1
 
 
+# Short event names accepted alongside Claude Code's hook_event_name values
+_EVENT_ALIASES = {
+    'pre_tool': 'PreToolUse',
+    'post_tool': 'PostToolUse',
+    'user_prompt': 'UserPromptSubmit',
+    'session_start': 'SessionStart',
+    'session_end': 'SessionEnd',
+    'stop': 'Stop',
+    'subagent_stop': 'SubagentStop',
+    'notification': 'Notification',
+    'pre_compact': 'PreCompact',
+}
+
+# Handler building the ClaudeBench (method, params) for each event type
+_EVENT_HANDLERS = {
+    'PreToolUse': ClaudeBenchHookBridge.handle_pre_tool,
+    'PostToolUse': ClaudeBenchHookBridge.handle_post_tool,
+    'UserPromptSubmit': ClaudeBenchHookBridge.handle_user_prompt,
+    'SessionStart': ClaudeBenchHookBridge.handle_session_start,
+    'SessionEnd': ClaudeBenchHookBridge.handle_session_end,
+    'Stop': ClaudeBenchHookBridge.handle_stop,
+    'SubagentStop': ClaudeBenchHookBridge.handle_subagent_stop,
+    'Notification': ClaudeBenchHookBridge.handle_notification,
+    'PreCompact': ClaudeBenchHookBridge.handle_pre_compact,
+}
+
+
+def _read_interactive(bridge: ClaudeBenchHookBridge) -> bytes:
+    """Read a hook event typed at a terminal (--interactive, for testing)"""
+    bridge.debug_print("Interactive mode")
+    print("Claude Code Hook Bridge - Interactive Mode", file=sys.stderr)
+    print("Enter JSON input (Ctrl+D to end):", file=sys.stderr)
+    try:
+        # Try using input() first (single line)
+        input_data = input().encode('utf-8')
+        bridge.debug_print("Read via input(): %s...", input_data[:100])
+    except EOFError:
+        # Fall back to reading all of stdin
+        input_data = sys.stdin.buffer.read()
+        bridge.debug_print("Read via stdin.read(): %s...", input_data[:100])
+    return input_data
+
+
 def main():
     """Main entry point for the hook bridge"""
     bridge = ClaudeBenchHookBridge()
     
-    # Try different input methods based on how Claude Code might send data
-    input_data = ""
-    
     try:
-        # Check if we're in a TTY (interactive mode for testing)
-        if sys.stdin.isatty():
-            bridge.debug_print("Interactive mode detected (TTY)")
-            print("Claude Code Hook Bridge - Interactive Mode", file=sys.stderr)
-            print("Enter JSON input (Ctrl+D to end):", file=sys.stderr)
-            try:
-                # Try using input() first (single line)
-                input_data = input()
-                bridge.debug_print(f"Read via input(): {input_data[:100]}...")
-            except EOFError:
-                # Fall back to reading all of stdin
-                input_data = sys.stdin.read()
-                bridge.debug_print(f"Read via stdin.read(): {input_data[:100]}...")
+        if sys.argv[1:2] == ['--interactive']:
+            input_data = _read_interactive(bridge)
         else:
-            # Non-TTY mode - Claude Code is piping data
-            bridge.debug_print("Non-TTY mode - reading from pipe")
-            # Try to read all available data
-            input_data = sys.stdin.read()
-            bridge.debug_print(f"Read {len(input_data)} bytes from stdin")
-            
-            # If empty, try reading line by line
-            if not input_data:
-                bridge.debug_print("No data from stdin.read(), trying readline")
-                input_data = sys.stdin.readline()
-                bridge.debug_print(f"Read line: {input_data[:100]}...")
-    except Exception as e:
-        bridge.debug_print(f"Error reading input: {e}")
-        print(json.dumps({
+            # Claude Code pipes the event; the JSON parser decodes UTF-8 itself
+            input_data = sys.stdin.buffer.read()
+            bridge.debug_print("Read %d bytes from stdin", len(input_data))
+    except (OSError, ValueError) as e:
+        bridge.debug_print("Error reading input: %s", e)
+        _emit({
             'error': f'Failed to read input: {str(e)}'
-        }), file=sys.stderr)
+        }, sys.stderr)
         sys.exit(1)
     
     if not input_data.strip():
         bridge.debug_print("No input data received")
-        print(json.dumps({
+        _emit({
             'error': 'No input provided'
-        }), file=sys.stderr)
+        }, sys.stderr)
         sys.exit(1)
     
     # Process the hook
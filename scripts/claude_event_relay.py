@@ -17,21 +17,32 @@ Environment Variables:
     RELAY_ROLES: Comma-separated roles
     HEARTBEAT_INTERVAL: Seconds between heartbeats (default: 15)
     EVENT_CHANNELS: Comma-separated channels to subscribe (default: "task.*,hook.*,system.*")
+    CLAUDEBENCH_OUT_SOCK: Unix socket path to send events to instead of stdout
+    RELAY_ENCODING: Event encoding on the output socket, json or msgpack (default: json)
+    RELAY_THREAD_POOL: Worker threads for blocking calls such as urllib RPC (default: 4)
     DEBUG: Enable debug logging (default: false)
 
 Usage:
     python3 claude_event_relay.py
+
+Requires the redis package for event subscription. aiohttp (keep-alive RPC
+connection), orjson and uvloop are optional and used when installed.
 """
 
 import asyncio
 import json
 import os
+import queue
+import random
 import signal
+import socket
 import sys
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Set
+from typing import Callable, Dict, Any, Optional, List, Set
 from urllib import request, error
 from urllib.parse import urlparse
 
@@ -43,6 +54,97 @@ except ImportError:
     REDIS_AVAILABLE = False
     print("Warning: redis package not installed. Install with: pip install redis", file=sys.stderr)
 
+# aiohttp is optional: with it RPC calls share one keep-alive session,
+# without it each call is a blocking urllib request on the default executor
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# msgpack is optional: only needed for RELAY_ENCODING=msgpack
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# uvloop is optional: when installed the relay runs on its event loop
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# JSON codec for events and RPC bodies - use orjson when installed, otherwise
+# the stdlib (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumpb = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+
+def _encode_lines(events: List[Any]) -> bytes:
+    """Encode events as JSON documents, one per line"""
+    return b''.join([_dumpb(event) + b'\n' for event in events])
+
+
+def _encode_frames(events: List[Any]) -> bytes:
+    """Encode events as msgpack documents, each after its 4-byte big-endian length"""
+    frames = []
+    for event in events:
+        packed = msgpack.packb(event)
+        frames.append(len(packed).to_bytes(4, 'big'))
+        frames.append(packed)
+    return b''.join(frames)
+
+
+def _emit(data: bytes, sock: Optional[socket.socket] = None) -> None:
+    """Write encoded events to stdout (or sock) in one write"""
+    if sock is not None:
+        sock.sendall(data)
+    else:
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+
+# Local date and time of the current second, formatted once per second
+_iso_second = -1
+_iso_prefix = ''
+
+
+def _iso_now() -> str:
+    """Current local time in ISO 8601 with microseconds, like datetime.now().isoformat()"""
+    global _iso_second, _iso_prefix
+    now = time.time()
+    second = int(now)
+    if second != _iso_second:
+        _iso_second = second
+        _iso_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+    return f"{_iso_prefix}.{int((now - second) * 1000000):06d}"
+
+
+# Events waiting for stdout before new ones are dropped, and the most
+# written in one batch
+OUTPUT_QUEUE_SIZE = 1024
+OUTPUT_BATCH_SIZE = 128
+
+# Seconds shutdown waits for the writer thread to finish the queue
+OUTPUT_DRAIN_TIMEOUT = 5
+
+# Seconds a write to the output socket may block before it counts as failed
+OUTPUT_SOCKET_TIMEOUT = 5
+
+# Commands mentioning this script are the relay's own hook events
+RELAY_SCRIPT = 'claude_event_relay.py'
+RELAY_SCRIPT_BYTES = RELAY_SCRIPT.encode('utf-8')
+
 
 class ClaudeEventRelay:
     """Event relay/antenna for Claude Code instances in ClaudeBench"""
@@ -55,15 +157,25 @@ class ClaudeEventRelay:
             'CLAUDE_INSTANCE_ID', 
             f"claude-relay-{int(time.time() * 1000) % 1000000}"
         )
+        self.instance_id_bytes = self.instance_id.encode('utf-8')
         self.session_id = os.environ.get('CLAUDE_SESSION_ID', f'session-{int(time.time())}')
         self.roles = os.environ.get('RELAY_ROLES', 'general,backend,frontend,docs,tests,relay').split(',')
         
         # Timing configuration
         self.heartbeat_interval = int(os.environ.get('HEARTBEAT_INTERVAL', '15'))
         
+        # Threads for blocking calls run off the event loop
+        self.thread_pool_size = int(os.environ.get('RELAY_THREAD_POOL', '4'))
+        
+        # Output configuration
+        self.out_sock_path = os.environ.get('CLAUDEBENCH_OUT_SOCK')
+        self.out_encoding = os.environ.get('RELAY_ENCODING', 'json').lower()
+        
         # Event subscription configuration
         default_channels = "task.*,hook.*,system.*,instance.*"
         self.event_channels = os.environ.get('EVENT_CHANNELS', default_channels).split(',')
+        self.event_patterns = [c for c in self.event_channels if '*' in c]
+        self.event_exact_channels = [c for c in self.event_channels if '*' not in c]
         
         # Features
         self.debug = os.environ.get('DEBUG', '').lower() in ('true', '1', 'yes')
@@ -72,9 +184,13 @@ class ClaudeEventRelay:
         self.running = False
         self.registered = False
         self.request_counter = 0
+        self.http = None
         self.redis_client = None
         self.pubsub = None
         self.subscribed_channels = set()
+        self.out_queue = None
+        self.out_sock = None
+        self.writer_thread = None
         
         # Metrics for monitoring
         self.metrics = {
@@ -87,6 +203,9 @@ class ClaudeEventRelay:
     
     def log(self, level: str, message: str, **kwargs):
         """Structured logging output"""
+        if level == 'DEBUG' and not self.debug:
+            return
+        
         timestamp = datetime.now().isoformat()
         data = {
             'timestamp': timestamp,
@@ -99,47 +218,154 @@ class ClaudeEventRelay:
         
         # Always output as JSON for Claude Code to parse
         output = json.dumps(data)
-        print(output, file=sys.stderr if level in ('ERROR', 'WARN') else sys.stdout)
+        print(output, file=sys.stderr if level in ('ERROR', 'WARN') else sys.stdout, flush=True)
     
-    def forward_event(self, channel: str, event_data: Any):
-        """Forward event to Claude Code via stdout"""
-        # Filter out events from our own instance to reduce noise
+    def is_own_event(self, channel: str, event_data: Any) -> bool:
+        """Check whether an event originated from this relay instance"""
         if isinstance(event_data, dict):
             payload = event_data.get('payload', {})
             if isinstance(payload, dict):
                 # Check if this event is from our own instance
                 event_instance_id = payload.get('instanceId')
-                event_session_id = payload.get('sessionId')
                 
                 # Skip events that originated from this relay instance
                 if event_instance_id == self.instance_id:
                     if self.debug:
                         self.log('DEBUG', f"Filtered own instance event from {channel}", event_type=event_data.get('type'))
-                    return
+                    return True
                 
                 # Also filter relay script events (existing logic)
                 params = payload.get('params', {})
                 if isinstance(params, dict):
                     command = params.get('command', '')
-                    if 'claude_event_relay.py' in command:
+                    if RELAY_SCRIPT in command:
                         # Skip forwarding events about the relay itself
                         if self.debug:
                             self.log('DEBUG', f"Filtered self-referential relay event from {channel}")
-                        return
-        
+                        return True
+        return False
+    
+    def forward_event(self, channel: str, event_data: Any):
+        """Forward event to Claude Code via stdout"""
         # This is the critical function - it sends events to Claude Code
         event = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _iso_now(),
             'data': event_data
         }
         
-        # Output to stdout for Claude Code to receive
-        print(json.dumps(event), flush=True)
-        self.metrics['events_forwarded'] += 1
+        # Queue for the writer thread, which sends it to stdout, where
+        # Claude Code receives it, or the output socket, and counts it once
+        # written; written directly to stdout while the writer thread is not
+        # running
+        if self.out_queue is None:
+            _emit(_encode_lines([event]))
+            self.metrics['events_forwarded'] += 1
+        else:
+            try:
+                self.out_queue.put_nowait(event)
+            except queue.Full:
+                self.metrics['errors'] += 1
+                self.log('WARN', f"Output queue full, dropped event from {channel}")
+                return
         
         if self.debug:
             self.log('DEBUG', f"Forwarded event from {channel}", event_type=event_data.get('type'))
     
+    def start_output(self):
+        """Connect the output socket, if configured, and start the writer thread"""
+        if self.out_sock_path:
+            sock = None
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                # A stalled reader fails the write and sends events to stdout
+                sock.settimeout(OUTPUT_SOCKET_TIMEOUT)
+                sock.connect(self.out_sock_path)
+                self.out_sock = sock
+            except OSError as e:
+                self.log('WARN', f"Cannot connect to {self.out_sock_path}, writing events to stdout: {str(e)}")
+                if sock is not None:
+                    sock.close()
+        
+        # msgpack frames only go to the socket; stdout also carries log lines
+        encode = _encode_lines
+        if self.out_encoding == 'msgpack':
+            if self.out_sock is None:
+                self.log('WARN', "RELAY_ENCODING=msgpack needs CLAUDEBENCH_OUT_SOCK, using JSON")
+            elif not MSGPACK_AVAILABLE:
+                self.log('WARN', "msgpack package not installed, using JSON. Install with: pip install msgpack")
+            else:
+                encode = _encode_frames
+        
+        self.out_queue = queue.Queue(maxsize=OUTPUT_QUEUE_SIZE)
+        self.writer_thread = threading.Thread(
+            target=self.write_loop,
+            args=(self.out_queue, encode),
+            name='relay-output',
+            daemon=True
+        )
+        self.writer_thread.start()
+    
+    def write_loop(self, out_queue: queue.Queue, encode: Callable[[List[Any]], bytes]):
+        """
+        Write queued events to stdout (or the output socket), one write per
+        batch of ready events
+        
+        Runs in the writer thread so a slow reader on the other end of the
+        pipe never blocks the event loop. A None entry stops the thread.
+        If the output socket fails, events go to stdout from then on; if
+        stdout fails, nothing can receive events and the relay shuts down.
+        """
+        while True:
+            batch = [out_queue.get()]
+            while batch[-1] is not None and len(batch) < OUTPUT_BATCH_SIZE:
+                try:
+                    batch.append(out_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            while batch:
+                try:
+                    _emit(encode(batch), self.out_sock)
+                except (OSError, ValueError) as e:
+                    if self.out_sock is None:
+                        self.log('ERROR', f"Writing events failed, shutting down: {str(e)}")
+                        self.running = False
+                        return
+                    self.log('WARN', f"Writing to {self.out_sock_path} failed, writing events to stdout: {str(e)}")
+                    self.out_sock.close()
+                    self.out_sock = None
+                    encode = _encode_lines
+                    continue
+                self.metrics['events_forwarded'] += len(batch)
+                break
+            if stop:
+                return
+    
+    async def stop_output(self):
+        """Stop the writer thread once it has written the events still queued"""
+        out_queue, self.out_queue = self.out_queue, None
+        if out_queue is None:
+            return
+        
+        def drain():
+            if not self.writer_thread.is_alive():
+                return
+            try:
+                out_queue.put(None, timeout=OUTPUT_DRAIN_TIMEOUT)
+            except queue.Full:
+                return
+            self.writer_thread.join(OUTPUT_DRAIN_TIMEOUT)
+        
+        await asyncio.to_thread(drain)
+        self.writer_thread = None
+        
+        if self.out_sock:
+            self.out_sock.close()
+            self.out_sock = None
+    
     async def make_jsonrpc_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Make async JSONRPC 2.0 request to ClaudeBench server"""
         self.request_counter += 1
@@ -155,34 +381,11 @@ class ClaudeEventRelay:
         if self.debug:
             self.log('DEBUG', f"Request to {method}", request=jsonrpc_request)
         
-        # Use asyncio's run_in_executor for blocking I/O
-        loop = asyncio.get_event_loop()
-        
-        def blocking_request():
-            req = request.Request(
-                self.rpc_url,
-                data=json.dumps(jsonrpc_request).encode('utf-8'),
-                headers={
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json'
-                },
-                method='POST'
-            )
-            
-            try:
-                with request.urlopen(req, timeout=5) as response:
-                    return json.loads(response.read().decode('utf-8'))
-            except error.HTTPError as e:
-                error_body = e.read().decode('utf-8')
-                try:
-                    return json.loads(error_body)
-                except json.JSONDecodeError:
-                    raise Exception(f"HTTP {e.code}: {error_body}")
-            except Exception as e:
-                raise Exception(f"Request failed: {str(e)}")
-        
         try:
-            response = await loop.run_in_executor(None, blocking_request)
+            if self.http is not None:
+                response = await self.post_session(jsonrpc_request)
+            else:
+                response = await asyncio.to_thread(self.post_blocking, jsonrpc_request)
             
             if 'error' in response:
                 raise Exception(f"JSONRPC Error: {response['error']}")
@@ -194,6 +397,46 @@ class ClaudeEventRelay:
             self.log('ERROR', f"Request to {method} failed: {str(e)}")
             raise
     
+    async def post_session(self, jsonrpc_request: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a JSONRPC request over the shared aiohttp session"""
+        try:
+            async with self.http.post(self.rpc_url, data=_dumpb(jsonrpc_request)) as response:
+                body = await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise Exception(f"Request failed: {str(e) or type(e).__name__}")
+        
+        try:
+            return _loads(body)
+        except ValueError:
+            if status >= 400:
+                raise Exception(f"HTTP {status}: {body.decode('utf-8', 'replace')}")
+            raise Exception("Request failed: invalid JSON response")
+    
+    def post_blocking(self, jsonrpc_request: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a JSONRPC request with urllib (used when aiohttp is not installed)"""
+        req = request.Request(
+            self.rpc_url,
+            data=_dumpb(jsonrpc_request),
+            headers={
+                'Content-Type': 'application/json',
+                'Accept': 'application/json'
+            },
+            method='POST'
+        )
+        
+        try:
+            with request.urlopen(req, timeout=5) as response:
+                return _loads(response.read())
+        except error.HTTPError as e:
+            error_body = e.read().decode('utf-8')
+            try:
+                return json.loads(error_body)
+            except json.JSONDecodeError:
+                raise Exception(f"HTTP {e.code}: {error_body}")
+        except Exception as e:
+            raise Exception(f"Request failed: {str(e)}")
+    
     async def register(self) -> bool:
         """Register relay with ClaudeBench"""
         try:
@@ -292,8 +535,9 @@ class ClaudeEventRelay:
                     self.log('WARN', f"Too many heartbeat failures, attempting re-registration")
                     self.registered = False
                     
-                    # Wait a bit before re-registration attempt
-                    await asyncio.sleep(5)
+                    # Wait a bit before re-registration attempt, jittered so
+                    # relays that lost the server together do not retry together
+                    await asyncio.sleep(random.uniform(2.5, 7.5))
                     
                     if await self.register():
                         self.log('INFO', "Successfully re-registered after connection issues")
@@ -322,38 +566,39 @@ class ClaudeEventRelay:
                 host=host,
                 port=port,
                 db=db,
-                decode_responses=True
+                decode_responses=False
             )
             
-            # Test connection
-            await self.redis_client.ping()
-            if self.debug:
-                self.log('INFO', f"Connected to Redis at {host}:{port}/{db}")
-            
-            # Create pub/sub and subscribe to channels
+            # Create pub/sub and subscribe to channels. The first subscribe
+            # opens the connection, so an unreachable server fails here
+            # without a separate PING round trip.
             self.pubsub = self.redis_client.pubsub()
             
-            # Subscribe to pattern channels
-            for pattern in self.event_channels:
-                if '*' in pattern:
-                    await self.pubsub.psubscribe(pattern)
-                    self.subscribed_channels.add(pattern)
-                    if self.debug:
-                        self.log('INFO', f"Subscribed to pattern: {pattern}")
-                else:
-                    await self.pubsub.subscribe(pattern)
-                    self.subscribed_channels.add(pattern)
-                    if self.debug:
-                        self.log('INFO', f"Subscribed to channel: {pattern}")
+            # Subscribe to all patterns and all exact channels with one
+            # command each
+            if self.event_patterns:
+                await self.pubsub.psubscribe(*self.event_patterns)
+                if self.debug:
+                    self.log('INFO', f"Subscribed to patterns: {self.event_patterns}")
+            if self.event_exact_channels:
+                await self.pubsub.subscribe(*self.event_exact_channels)
+                if self.debug:
+                    self.log('INFO', f"Subscribed to channels: {self.event_exact_channels}")
+            self.subscribed_channels.update(self.event_channels)
+            if self.debug:
+                self.log('INFO', f"Connected to Redis at {host}:{port}/{db}")
             
             return True
             
         except Exception as e:
             self.log('ERROR', f"Redis setup failed: {str(e)}")
+            self.pubsub = None
             return False
     
     async def event_subscription_loop(self):
         """Listen for Redis events and forward to Claude Code with auto-reconnect"""
+        # Decorrelated jitter: each delay is drawn between 1s and three times
+        # the previous one, so relays reconnecting at once drift apart
         reconnect_delay = 1  # Start with 1 second delay
         max_reconnect_delay = 30  # Max 30 seconds between reconnections
         
@@ -362,9 +607,9 @@ class ClaudeEventRelay:
                 if not self.pubsub:
                     self.log('INFO', "Setting up Redis subscription...")
                     if not await self.setup_redis_subscription():
-                        self.log('WARN', f"Redis setup failed, retrying in {reconnect_delay}s")
+                        reconnect_delay = min(random.uniform(1, reconnect_delay * 3), max_reconnect_delay)
+                        self.log('WARN', f"Redis setup failed, retrying in {reconnect_delay:.1f}s")
                         await asyncio.sleep(reconnect_delay)
-                        reconnect_delay = min(reconnect_delay * 2, max_reconnect_delay)
                         continue
                 
                 if self.debug:
@@ -373,33 +618,34 @@ class ClaudeEventRelay:
                 # Reset reconnect delay on successful connection
                 reconnect_delay = 1
                 
-                async for message in self.pubsub.listen():
-                    if not self.running:
-                        break
-                        
-                    if message['type'] in ('message', 'pmessage'):
-                        self.metrics['events_received'] += 1
-                        
-                        # Parse the event data
-                        channel = message.get('channel') or message.get('pattern')
-                        data_str = message.get('data')
-                        
-                        try:
-                            # Try to parse as JSON
-                            event_data = json.loads(data_str) if isinstance(data_str, str) else data_str
-                        except json.JSONDecodeError:
-                            # If not JSON, forward as string
-                            event_data = {'raw': data_str}
-                        
-                        # Forward to Claude Code
-                        self.forward_event(channel, event_data)
-                        
-                    elif message['type'] == 'subscribe':
-                        if self.debug:
-                            self.log('DEBUG', f"Subscribed to {message['channel']}")
-                    elif message['type'] == 'psubscribe':
-                        if self.debug:
-                            self.log('DEBUG', f"Pattern subscribed to {message['channel']}")
+                # Wake up at least once a second to notice shutdown
+                while self.running:
+                    message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None or message['type'] not in ('message', 'pmessage'):
+                        continue
+                    
+                    self.metrics['events_received'] += 1
+                    
+                    # Parse the event data; the payload stays bytes, which the
+                    # JSON parser reads directly
+                    channel = (message.get('channel') or message.get('pattern')).decode('utf-8', 'replace')
+                    data = message.get('data')
+                    
+                    try:
+                        # Try to parse as JSON
+                        event_data = _loads(data)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        # If not JSON, forward as string
+                        event_data = {'raw': data.decode('utf-8', 'replace')}
+                    
+                    # Only a message naming this instance or the relay script
+                    # can be our own, so the rest skip the origin check
+                    if ((self.instance_id_bytes in data or RELAY_SCRIPT_BYTES in data)
+                            and self.is_own_event(channel, event_data)):
+                        continue
+                    
+                    # Forward to Claude Code
+                    self.forward_event(channel, event_data)
                         
             except asyncio.CancelledError:
                 self.log('INFO', "Event subscription loop cancelled")
@@ -425,9 +671,9 @@ class ClaudeEventRelay:
                 
                 # Re-register with ClaudeBench after Redis reconnection
                 if self.running:
-                    self.log('INFO', f"Attempting Redis reconnection in {reconnect_delay}s")
+                    reconnect_delay = min(random.uniform(1, reconnect_delay * 3), max_reconnect_delay)
+                    self.log('INFO', f"Attempting Redis reconnection in {reconnect_delay:.1f}s")
                     await asyncio.sleep(reconnect_delay)
-                    reconnect_delay = min(reconnect_delay * 2, max_reconnect_delay)
                     
                     # Re-register after reconnection
                     self.registered = False
@@ -451,6 +697,12 @@ class ClaudeEventRelay:
         
         # Unregister from system
         await self.unregister()
+        await self.stop_output()
+        
+        # Close the RPC session once the last request is sent
+        if self.http:
+            await self.http.close()
+            self.http = None
         
         # Log final metrics
         self.log('INFO', "Final metrics", metrics=self.metrics)
@@ -461,9 +713,32 @@ class ClaudeEventRelay:
             self.log('INFO', f"Starting Claude Event Relay: {self.instance_id}")
         self.running = True
         
+        # A small pool for blocking calls, so a misbehaving relay cannot open
+        # more concurrent RPC connections than this
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.thread_pool_size, thread_name_prefix='relay-rpc')
+        )
+        
+        # One keep-alive session for registration, heartbeats and unregister
+        if AIOHTTP_AVAILABLE:
+            self.http = aiohttp.ClientSession(
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                },
+                timeout=aiohttp.ClientTimeout(total=5)
+            )
+        
+        # Batch events onto stdout or the output socket from here on
+        self.start_output()
+        
         # Register with ClaudeBench
         if not await self.register():
             self.log('ERROR', "Failed to register, exiting")
+            await self.stop_output()
+            if self.http:
+                await self.http.close()
+                self.http = None
             return
         
         # Setup Redis subscriptions
@@ -515,8 +790,8 @@ async def main():
 
 if __name__ == '__main__':
     # Check Python version
-    if sys.version_info < (3, 7):
-        print("Error: Python 3.7 or higher required", file=sys.stderr)
+    if sys.version_info < (3, 9):
+        print("Error: Python 3.9 or higher required", file=sys.stderr)
         sys.exit(1)
     
     print("""
@@ -528,5 +803,11 @@ if __name__ == '__main__':
     ╚══════════════════════════════════════════════════════════╝
     """, file=sys.stderr)
     
-    # Run the relay
-    asyncio.run(main())
+    # Run the relay; uvloop.run() needs uvloop 0.18+, older ones install
+    # their loop policy for asyncio.run()
+    if UVLOOP_AVAILABLE and hasattr(uvloop, 'run'):
+        uvloop.run(main())
+    else:
+        if UVLOOP_AVAILABLE:
+            uvloop.install()
+        asyncio.run(main())
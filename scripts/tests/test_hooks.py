@@ -4,13 +4,15 @@ Test script for hook endpoints - mimics hook-client.py behavior
 This ensures the server endpoints match the exact signatures expected by the client
 """
 
+import http.client
 import json
 import os
 import sys
-import urllib.request
-import urllib.error
+import threading
+import time
 import urllib.parse
-from typing import Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # Configuration
 API_URL = os.environ.get('CLAUDEBENCH_API_URL', 'http://localhost:3000')
@@ -23,6 +25,21 @@ YELLOW = '\033[1;33m'
 BLUE = '\033[0;34m'
 NC = '\033[0m'  # No Color
 
+# JSON codec - use orjson when installed, otherwise the stdlib
+# (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _loads = json.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
 # Map hook names to API endpoints (Hono routes)
 HOOK_ENDPOINTS = {
     'pre-tool-use': '/hooks/pre_tool',
@@ -31,64 +48,147 @@ HOOK_ENDPOINTS = {
     'todo-write': '/hooks/todo_write'
 }
 
-def make_request(endpoint: str, data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+# One kept-alive connection to the API server per worker thread
+_API = urllib.parse.urlsplit(API_URL)
+_CONNECTION_CLASS = http.client.HTTPSConnection if _API.scheme == 'https' else http.client.HTTPConnection
+_local = threading.local()
+
+# Backoff before each retry of a connection attempt the server didn't accept
+_CONNECT_RETRY_DELAYS = (0.05, 0.2)
+
+# Request path of each hook endpoint on the API server
+_HOOK_PATHS = {endpoint: f"{_API.path}{endpoint}" for endpoint in HOOK_ENDPOINTS.values()}
+
+# Headers sent with every request (same as hook-client.py)
+_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+
+# Add authentication token if provided
+if API_TOKEN:
+    _HEADERS['Authorization'] = f'Bearer {API_TOKEN}'
+
+def post(path: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, str, bytes]:
     """
-    Make HTTP POST request to ClaudeBench API
-    Returns (response_data, exit_code)
+    POST a request body over this thread's kept-alive connection
+    
+    A connection that was already used may have been closed by the server
+    while idle; in that case the request is retried once on a fresh one.
+    
+    Returns (status, reason, response_body)
+    """
+    reused = getattr(_local, 'connection_used', False)
+    try:
+        return _post_once(path, body, headers)
+    except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+        if not reused:
+            raise
+        return _post_once(path, body, headers)
+
+def _connect() -> http.client.HTTPConnection:
     """
-    url = f"{API_URL}{endpoint}"
+    Open a connection to the server, retrying with backoff while it can't be reached
     
-    # Prepare the request (same as hook-client.py)
-    headers = {
-        'Content-Type': 'application/json',
-        'Accept': 'application/json'
-    }
+    Only connecting is retried: once a request has been sent it is never
+    repeated, so a hook the server already handled can't run twice.
+    """
+    for delay in _CONNECT_RETRY_DELAYS:
+        connection = _CONNECTION_CLASS(_API.hostname, _API.port, timeout=10)
+        try:
+            connection.connect()
+            return connection
+        except OSError:
+            connection.close()
+            time.sleep(delay)
+    connection = _CONNECTION_CLASS(_API.hostname, _API.port, timeout=10)
+    connection.connect()
+    return connection
+
+def _post_once(path: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, str, bytes]:
+    """Send one POST, opening the connection if needed and dropping it on failure"""
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        connection = _local.connection = _connect()
+        _local.connection_used = False
+    try:
+        connection.request('POST', path, body=body, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+    except Exception:
+        connection.close()
+        _local.connection = None
+        raise
+    
+    if response.will_close:
+        connection.close()
+        _local.connection = None
+    else:
+        _local.connection_used = True
+    return response.status, response.reason, data
+
+def log(message: str = '') -> None:
+    """Record an output line for the test running on this thread, or print it outside one"""
+    lines = getattr(_local, 'lines', None)
+    if lines is None:
+        print(message)
+    else:
+        lines.append(message)
+
+def run_test(test: Callable[..., bool], *args: Any) -> Tuple[bool, List[str]]:
+    """
+    Run one test on a worker thread
+    Returns (passed, output_lines)
+    """
+    _local.lines = []
+    return test(*args), _local.lines
+
+def write_output(lines: List[str]) -> None:
+    """Write collected output lines to stdout in a single write"""
+    sys.stdout.write(''.join(f'{line}\n' for line in lines))
+    sys.stdout.flush()
+
+def make_request(endpoint: str, data: Dict[str, Any], body: Optional[bytes] = None) -> Tuple[Dict[str, Any], int]:
+    """
+    Make HTTP POST request to ClaudeBench API
+    Returns (response_data, exit_code)
     
-    # Add authentication token if provided
-    if API_TOKEN:
-        headers['Authorization'] = f'Bearer {API_TOKEN}'
+    body is the already-encoded JSON of data, when the caller has it
+    """
+    path = _HOOK_PATHS.get(endpoint) or f"{_API.path}{endpoint}"
     
     # Direct JSON payload for Hono routes
-    json_data = json.dumps(data).encode('utf-8')
-    
-    # Create the request
-    request = urllib.request.Request(
-        url,
-        data=json_data,
-        headers=headers,
-        method='POST'
-    )
+    json_data = body if body is not None else _dumpb(data)
     
     try:
         # Make the request
-        with urllib.request.urlopen(request, timeout=10) as response:
-            response_data = response.read().decode('utf-8')
-            result = json.loads(response_data)
-            
-            # Determine exit code based on response
-            # Handle both success:true,allow:false AND success:false,blocked:true patterns
-            if result.get('success', False):
-                if result.get('allow', True):
-                    return result, 0  # Success, allow operation
-                else:
-                    return result, 1  # Success, but block operation
-            elif result.get('blocked', False):
-                # Also treat blocked:true as exit code 1 (blocked but handled)
-                return result, 1  # Blocked operation
+        status, reason, response_data = post(path, json_data, _HEADERS)
+        
+        if not 200 <= status < 300:
+            return {
+                'error': f'HTTP {status}: {reason}',
+                'details': response_data.decode('utf-8', 'replace'),
+                'success': False
+            }, 2
+        
+        result = _loads(response_data)
+        
+        # Determine exit code based on response
+        # Handle both success:true,allow:false AND success:false,blocked:true patterns
+        if result.get('success', False):
+            if result.get('allow', True):
+                return result, 0  # Success, allow operation
             else:
-                return result, 2  # Error
-    
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8') if e.read() else ''
-        return {
-            'error': f'HTTP {e.code}: {e.reason}',
-            'details': error_body,
-            'success': False
-        }, 2
+                return result, 1  # Success, but block operation
+        elif result.get('blocked', False):
+            # Also treat blocked:true as exit code 1 (blocked but handled)
+            return result, 1  # Blocked operation
+        else:
+            return result, 2  # Error
     
-    except urllib.error.URLError as e:
+    except (OSError, http.client.HTTPException) as e:
         return {
-            'error': f'Network error: {str(e.reason)}',
+            'error': f'Network error: {str(e)}',
             'success': False
         }, 2
     
@@ -104,80 +204,67 @@ def make_request(endpoint: str, data: Dict[str, Any]) -> Tuple[Dict[str, Any], i
             'success': False
         }, 2
 
-def test_hook(hook_name: str, payload: Dict[str, Any], expected_exit_code: int = 0) -> bool:
+def test_hook(hook_name: str, payload: Dict[str, Any], expected_exit_code: int = 0, body: Optional[bytes] = None) -> bool:
     """Test a specific hook endpoint"""
     if hook_name not in HOOK_ENDPOINTS:
         # For invalid hooks, we expect them to fail
         if expected_exit_code == 2:
-            print(f"{GREEN}[✓]{NC} Unknown hook correctly rejected: {hook_name}")
+            log(f"{GREEN}[✓]{NC} Unknown hook correctly rejected: {hook_name}")
             return True
         else:
-            print(f"{RED}[✗]{NC} Unknown hook: {hook_name}")
+            log(f"{RED}[✗]{NC} Unknown hook: {hook_name}")
             return False
     
     endpoint = HOOK_ENDPOINTS[hook_name]
-    print(f"{BLUE}[TEST]{NC} Testing {hook_name} ({endpoint})...")
+    log(f"{BLUE}[TEST]{NC} Testing {hook_name} ({endpoint})...")
     
-    response, exit_code = make_request(endpoint, payload)
+    response, exit_code = make_request(endpoint, payload, body)
     
     if exit_code == expected_exit_code:
-        print(f"{GREEN}[✓]{NC} {hook_name} passed (exit_code={exit_code})")
+        log(f"{GREEN}[✓]{NC} {hook_name} passed (exit_code={exit_code})")
         if 'reason' in response and response.get('blocked'):
-            print(f"  Blocked reason: {response['reason']}")
+            log(f"  Blocked reason: {response['reason']}")
         return True
     else:
-        print(f"{RED}[✗]{NC} {hook_name} failed (expected={expected_exit_code}, actual={exit_code})")
+        log(f"{RED}[✗]{NC} {hook_name} failed (expected={expected_exit_code}, actual={exit_code})")
         if 'error' in response:
-            print(f"  Error: {response['error']}")
+            log(f"  Error: {response['error']}")
         if 'reason' in response:
-            print(f"  Reason: {response['reason']}")
+            log(f"  Reason: {response['reason']}")
         return False
 
-def main():
-    """Run all hook endpoint tests"""
-    print(f"\n{BLUE}Hook Endpoint Test Suite{NC}")
-    print("=" * 50)
-    print(f"API URL: {API_URL}")
-    print()
-    
-    # Skip healthCheck since ORPC doesn't support GET requests
-    # The server logs show it's running, so we'll test directly
-    print(f"{BLUE}[INFO]{NC} Testing server at {API_URL}")
-    print(f"{YELLOW}[NOTE]{NC} ORPC doesn't support GET requests, testing POST endpoints directly")
-    
-    print()
-    tests_passed = 0
-    tests_total = 0
-    
+def test_validation_error() -> bool:
+    """Test that a request missing required fields is rejected"""
+    endpoint = HOOK_ENDPOINTS['pre-tool-use']
+    log(f"{BLUE}[TEST]{NC} Testing validation error handling...")
+    response, exit_code = make_request(endpoint, {'tool': 'Read'})  # Missing 'parameters'
+    if exit_code == 2:
+        log(f"{GREEN}[✓]{NC} Validation error correctly returned exit_code=2")
+        return True
+    else:
+        log(f"{RED}[✗]{NC} Expected validation error")
+        return False
+
+# Test cases: (hook_name, payload, expected_exit_code)
+TESTS = [
     # Test 1: Pre-tool-use with safe tool (should allow)
-    tests_total += 1
-    if test_hook('pre-tool-use', {
+    ('pre-tool-use', {
         'tool': 'Read',
         'parameters': {'file_path': '/tmp/test.txt'},
         'instanceId': 'MASTER',
         'correlationId': '550e8400-e29b-41d4-a716-446655440001',
         'timestamp': '2024-01-01T00:00:00Z'
-    }, expected_exit_code=0):
-        tests_passed += 1
-    
-    print()
-    
+    }, 0),
     # Test 2: Pre-tool-use with dangerous tool (should block)
-    tests_total += 1
-    if test_hook('pre-tool-use', {
+    ('pre-tool-use', {
         'tool': 'rm',
         'parameters': {'path': '/important/file'},
         'instanceId': 'WORKER1',
         'correlationId': '550e8400-e29b-41d4-a716-446655440002',
         'timestamp': '2024-01-01T00:00:01Z'
-    }, expected_exit_code=1):  # Expect exit code 1 (blocked)
-        tests_passed += 1
-    
-    print()
-    
+    }, 1),  # Expect exit code 1 (blocked)
     # Test 3: Post-tool-use (should always allow)
-    tests_total += 1
-    if test_hook('post-tool-use', {
+    ('post-tool-use', {
         'tool': 'Write',
         'parameters': {'file_path': '/tmp/output.txt', 'content': 'Test'},
         'result': {'success': True, 'bytesWritten': 4},
@@ -185,14 +272,9 @@ def main():
         'instanceId': 'MASTER',
         'correlationId': '550e8400-e29b-41d4-a716-446655440003',
         'timestamp': '2024-01-01T00:00:02Z'
-    }, expected_exit_code=0):
-        tests_passed += 1
-    
-    print()
-    
+    }, 0),
     # Test 4: Post-tool-use with error (should still allow)
-    tests_total += 1
-    if test_hook('post-tool-use', {
+    ('post-tool-use', {
         'tool': 'Bash',
         'parameters': {'command': 'ls /nonexistent'},
         'result': {'error': 'Directory not found', 'exitCode': 1},
@@ -200,40 +282,25 @@ def main():
         'instanceId': 'WORKER2',
         'correlationId': '550e8400-e29b-41d4-a716-446655440004',
         'timestamp': '2024-01-01T00:00:03Z'
-    }, expected_exit_code=0):  # Post hooks don't block
-        tests_passed += 1
-    
-    print()
-    
+    }, 0),  # Post hooks don't block
     # Test 5: User-prompt-submit with clean prompt
-    tests_total += 1
-    if test_hook('user-prompt-submit', {
+    ('user-prompt-submit', {
         'prompt': 'Help me refactor this function',
         'context': {'currentFile': 'app.ts'},
         'instanceId': 'MASTER',
         'correlationId': '550e8400-e29b-41d4-a716-446655440005',
         'timestamp': '2024-01-01T00:00:04Z'
-    }, expected_exit_code=0):
-        tests_passed += 1
-    
-    print()
-    
+    }, 0),
     # Test 6: User-prompt-submit with extremely long prompt (should block)
-    tests_total += 1
-    if test_hook('user-prompt-submit', {
+    ('user-prompt-submit', {
         'prompt': 'x' * 10001,  # Over 10000 chars
         'context': {},
         'instanceId': 'WORKER1',
         'correlationId': '550e8400-e29b-41d4-a716-446655440006',
         'timestamp': '2024-01-01T00:00:05Z'
-    }, expected_exit_code=1):  # Should block due to length
-        tests_passed += 1
-    
-    print()
-    
+    }, 1),  # Should block due to length
     # Test 7: Todo-write create operation
-    tests_total += 1
-    if test_hook('todo-write', {
+    ('todo-write', {
         'todos': [
             {'content': 'Implement feature', 'status': 'pending'},
             {'content': 'Add tests', 'status': 'in_progress', 'activeForm': 'Writing tests'}
@@ -242,14 +309,9 @@ def main():
         'instanceId': 'MASTER',
         'correlationId': '550e8400-e29b-41d4-a716-446655440007',
         'timestamp': '2024-01-01T00:00:06Z'
-    }, expected_exit_code=0):
-        tests_passed += 1
-    
-    print()
-    
+    }, 0),
     # Test 8: Todo-write update operation
-    tests_total += 1
-    if test_hook('todo-write', {
+    ('todo-write', {
         'todos': [
             {'content': 'Implement feature', 'status': 'completed', 'activeForm': 'Done'}
         ],
@@ -257,37 +319,56 @@ def main():
         'instanceId': 'WORKER1',
         'correlationId': '550e8400-e29b-41d4-a716-446655440008',
         'timestamp': '2024-01-01T00:00:07Z'
-    }, expected_exit_code=0):
-        tests_passed += 1
+    }, 0),
+    # Test 9: Invalid hook name (should fail)
+    ('invalid-hook', {}, 2),
+]
+
+# Request bodies of TESTS, encoded once up front
+TEST_BODIES = [_dumpb(payload) for _, payload, _ in TESTS]
+
+def main():
+    """Run all hook endpoint tests"""
+    # Output is collected and written out in one go at the end
+    output = _local.lines = []
     
-    print()
+    log(f"\n{BLUE}Hook Endpoint Test Suite{NC}")
+    log("=" * 50)
+    log(f"API URL: {API_URL}")
+    log()
     
-    # Test 9: Invalid hook name (should fail)
-    tests_total += 1
-    if test_hook('invalid-hook', {}, expected_exit_code=2):
-        tests_passed += 1
+    # Skip healthCheck since ORPC doesn't support GET requests
+    # The server logs show it's running, so we'll test directly
+    log(f"{BLUE}[INFO]{NC} Testing server at {API_URL}")
+    log(f"{YELLOW}[NOTE]{NC} ORPC doesn't support GET requests, testing POST endpoints directly")
     
-    print()
+    log()
     
     # Test 10: Missing required fields (validation error)
-    tests_total += 1
-    endpoint = HOOK_ENDPOINTS['pre-tool-use']
-    print(f"{BLUE}[TEST]{NC} Testing validation error handling...")
-    response, exit_code = make_request(endpoint, {'tool': 'Read'})  # Missing 'parameters'
-    if exit_code == 2:
-        print(f"{GREEN}[✓]{NC} Validation error correctly returned exit_code=2")
-        tests_passed += 1
-    else:
-        print(f"{RED}[✗]{NC} Expected validation error")
+    tests = [(test_hook, *test, body) for test, body in zip(TESTS, TEST_BODIES)] + [(test_validation_error,)]
+    
+    # Tests are independent, so they all run at once; output is kept in test order
+    with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+        results = list(pool.map(lambda test: run_test(*test), tests))
+    
+    for index, (_, lines) in enumerate(results):
+        if index:
+            log()
+        output.extend(lines)
+    
+    tests_passed = sum(passed for passed, _ in results)
+    tests_total = len(results)
     
     # Summary
-    print()
-    print("=" * 50)
+    log()
+    log("=" * 50)
     if tests_passed == tests_total:
-        print(f"{GREEN}[✓] All tests passed! ({tests_passed}/{tests_total}){NC}")
+        log(f"{GREEN}[✓] All tests passed! ({tests_passed}/{tests_total}){NC}")
+        write_output(output)
         sys.exit(0)
     else:
-        print(f"{YELLOW}[!] {tests_passed}/{tests_total} tests passed{NC}")
+        log(f"{YELLOW}[!] {tests_passed}/{tests_total} tests passed{NC}")
+        write_output(output)
         sys.exit(1)
 
 if __name__ == '__main__':
@@ -4,12 +4,14 @@ Test script for hook handlers using JSONRPC 2.0 protocol at /rpc endpoint
 Tests the ClaudeBench event-driven architecture with hook handlers
 """
 
+import http.client
 import json
 import os
 import sys
-import urllib.request
-import urllib.error
-from typing import Dict, Any, Tuple, Optional
+import threading
+import time
+import urllib.parse
+from typing import Dict, Any, List, Tuple, Optional
 
 # Configuration
 RPC_URL = os.environ.get('CLAUDEBENCH_RPC_URL', 'http://localhost:3000/rpc')
@@ -22,18 +24,115 @@ YELLOW = '\033[1;33m'
 BLUE = '\033[0;34m'
 NC = '\033[0m'  # No Color
 
-def make_jsonrpc_request(method: str, params: Dict[str, Any], request_id: Optional[int] = None) -> Tuple[Dict[str, Any], int]:
+# JSON codec - use orjson when installed, otherwise the stdlib
+# (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _loads = json.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# One kept-alive connection to the RPC endpoint per thread
+_RPC = urllib.parse.urlsplit(RPC_URL)
+_RPC_PATH = _RPC.path or '/'
+_RPC_BATCH_PATH = _RPC.path.rstrip('/') + '/batch'
+_CONNECTION_CLASS = http.client.HTTPSConnection if _RPC.scheme == 'https' else http.client.HTTPConnection
+_local = threading.local()
+
+# Backoff before each retry of a connection attempt the server didn't accept
+_CONNECT_RETRY_DELAYS = (0.05, 0.2)
+
+# Headers sent with every request
+_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+
+# Add authentication token if provided
+if API_TOKEN:
+    _HEADERS['Authorization'] = f'Bearer {API_TOKEN}'
+
+def post(body: bytes, headers: Dict[str, str], path: str = _RPC_PATH) -> Tuple[int, str, bytes]:
     """
-    Make JSONRPC 2.0 request to ClaudeBench /rpc endpoint
-    Returns (response_data, exit_code)
+    POST a request body to an RPC path over this thread's kept-alive connection
     
-    Exit codes:
-    - 0: Success (allowed/processed)
-    - 1: Blocked by hook
-    - 2: Error
+    A connection that was already used may have been closed by the server
+    while idle; in that case the request is retried once on a fresh one.
+    
+    Returns (status, reason, response_body)
+    """
+    reused = getattr(_local, 'connection_used', False)
+    try:
+        return _post_once(body, headers, path)
+    except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+        if not reused:
+            raise
+        return _post_once(body, headers, path)
+
+def _connect() -> http.client.HTTPConnection:
     """
-    # Build JSONRPC 2.0 request
-    jsonrpc_request = {
+    Open a connection to the server, retrying with backoff while it can't be reached
+    
+    Only connecting is retried: once a request has been sent it is never
+    repeated, so a hook the server already handled can't run twice.
+    """
+    for delay in _CONNECT_RETRY_DELAYS:
+        connection = _CONNECTION_CLASS(_RPC.hostname, _RPC.port, timeout=10)
+        try:
+            connection.connect()
+            return connection
+        except OSError:
+            connection.close()
+            time.sleep(delay)
+    connection = _CONNECTION_CLASS(_RPC.hostname, _RPC.port, timeout=10)
+    connection.connect()
+    return connection
+
+def _post_once(body: bytes, headers: Dict[str, str], path: str) -> Tuple[int, str, bytes]:
+    """Send one POST, opening the connection if needed and dropping it on failure"""
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        connection = _local.connection = _connect()
+        _local.connection_used = False
+    try:
+        connection.request('POST', path, body=body, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+    except Exception:
+        connection.close()
+        _local.connection = None
+        raise
+    
+    if response.will_close:
+        connection.close()
+        _local.connection = None
+    else:
+        _local.connection_used = True
+    return response.status, response.reason, data
+
+def log(message: str = '') -> None:
+    """Record an output line for the test running on this thread, or print it outside one"""
+    lines = getattr(_local, 'lines', None)
+    if lines is None:
+        print(message)
+    else:
+        lines.append(message)
+
+def write_output(lines: List[str]) -> None:
+    """Write collected output lines to stdout in a single write"""
+    sys.stdout.write(''.join(f'{line}\n' for line in lines))
+    sys.stdout.flush()
+
+def jsonrpc_request(method: str, params: Dict[str, Any], request_id: Optional[int] = None) -> Dict[str, Any]:
+    """Build a JSONRPC 2.0 request, or a notification when request_id is None"""
+    request = {
         "jsonrpc": "2.0",
         "method": method,
         "params": params
@@ -41,163 +140,207 @@ def make_jsonrpc_request(method: str, params: Dict[str, Any], request_id: Option
     
     # Add ID if provided (makes it a request expecting response)
     if request_id is not None:
-        jsonrpc_request["id"] = request_id
-    
-    # Prepare HTTP headers
-    headers = {
-        'Content-Type': 'application/json',
-        'Accept': 'application/json'
-    }
-    
-    # Add authentication token if provided
-    if API_TOKEN:
-        headers['Authorization'] = f'Bearer {API_TOKEN}'
-    
-    # Encode request as JSON
-    json_data = json.dumps(jsonrpc_request).encode('utf-8')
-    
-    # Create HTTP request
-    request = urllib.request.Request(
-        RPC_URL,
-        data=json_data,
-        headers=headers,
-        method='POST'
-    )
+        request["id"] = request_id
     
+    return request
+
+def post_jsonrpc(body: bytes, path: str = _RPC_PATH) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """
+    POST an encoded JSONRPC 2.0 request or batch to ClaudeBench
+    Returns (parsed_response, None), or (None, error_response) if the POST itself failed
+    """
     try:
         # Make the request
-        with urllib.request.urlopen(request, timeout=10) as response:
-            response_data = response.read().decode('utf-8')
-            result = json.loads(response_data)
-            
-            # Check for JSONRPC error response
-            if 'error' in result:
-                error_code = result['error'].get('code', -32603)
-                error_msg = result['error'].get('message', 'Unknown error')
-                
-                # Hook blocked is a special case - exit code 1
-                if error_code == -32003:  # HOOK_BLOCKED custom error code
-                    return result, 1
-                else:
-                    print(f"  JSONRPC Error {error_code}: {error_msg}")
-                    return result, 2
-            
-            # Success response with result
-            if 'result' in result:
-                response_result = result.get('result', {})
-                
-                # Check hook-specific blocking conditions
-                if isinstance(response_result, dict):
-                    # For hook.pre_tool: check 'allow' field
-                    if method == 'hook.pre_tool' and not response_result.get('allow', True):
-                        return result, 1  # Blocked
-                    
-                    # For hook.user_prompt: check 'continue' field  
-                    if method == 'hook.user_prompt' and not response_result.get('continue', True):
-                        return result, 1  # Blocked
-                
-                return result, 0  # Success
-            
-            # Neither error nor result - malformed response
-            print(f"  Malformed JSONRPC response: {result}")
-            return result, 2
-    
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8') if e.fp else ''
-        print(f"  HTTP Error {e.code}: {e.reason}")
-        if error_body:
-            print(f"  Response: {error_body}")
-        return {
-            'error': {
-                'code': -32603,
-                'message': f'HTTP {e.code}: {e.reason}'
+        status, reason, response_data = post(body, _HEADERS, path)
+        
+        if not 200 <= status < 300:
+            error_body = response_data.decode('utf-8', 'replace')
+            log(f"  HTTP Error {status}: {reason}")
+            if error_body:
+                log(f"  Response: {error_body}")
+            return None, {
+                'error': {
+                    'code': -32603,
+                    'message': f'HTTP {status}: {reason}'
+                }
             }
-        }, 2
+        
+        return _loads(response_data), None
     
-    except urllib.error.URLError as e:
-        print(f"  Network Error: {e.reason}")
-        return {
+    except (OSError, http.client.HTTPException) as e:
+        log(f"  Network Error: {e}")
+        return None, {
             'error': {
                 'code': -32603,
-                'message': f'Network error: {str(e.reason)}'
+                'message': f'Network error: {str(e)}'
             }
-        }, 2
+        }
     
     except json.JSONDecodeError as e:
-        print(f"  JSON Parse Error: {e}")
-        return {
+        log(f"  JSON Parse Error: {e}")
+        return None, {
             'error': {
                 'code': -32700,
                 'message': f'Invalid JSON response: {str(e)}'
             }
-        }, 2
+        }
     
     except Exception as e:
-        print(f"  Unexpected Error: {e}")
-        return {
+        log(f"  Unexpected Error: {e}")
+        return None, {
             'error': {
                 'code': -32603,
                 'message': f'Unexpected error: {str(e)}'
             }
+        }
+
+def jsonrpc_outcome(method: str, result: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+    """
+    Map the JSONRPC 2.0 response to a request onto a hook exit code
+    Returns (response_data, exit_code)
+    
+    Exit codes:
+    - 0: Success (allowed/processed)
+    - 1: Blocked by hook
+    - 2: Error
+    """
+    # No response for this request ID
+    if result is None:
+        log(f"  Missing JSONRPC response")
+        return {
+            'error': {
+                'code': -32603,
+                'message': 'Missing response'
+            }
         }, 2
+    
+    # Check for JSONRPC error response
+    if 'error' in result:
+        error_code = result['error'].get('code', -32603)
+        error_msg = result['error'].get('message', 'Unknown error')
+        
+        # Hook blocked is a special case - exit code 1
+        if error_code == -32003:  # HOOK_BLOCKED custom error code
+            return result, 1
+        else:
+            log(f"  JSONRPC Error {error_code}: {error_msg}")
+            return result, 2
+    
+    # Success response with result
+    if 'result' in result:
+        response_result = result.get('result', {})
+        
+        # Check hook-specific blocking conditions
+        if isinstance(response_result, dict):
+            # For hook.pre_tool: check 'allow' field
+            if method == 'hook.pre_tool' and not response_result.get('allow', True):
+                return result, 1  # Blocked
+            
+            # For hook.user_prompt: check 'continue' field  
+            if method == 'hook.user_prompt' and not response_result.get('continue', True):
+                return result, 1  # Blocked
+        
+        return result, 0  # Success
+    
+    # Neither error nor result - malformed response
+    log(f"  Malformed JSONRPC response: {result}")
+    return result, 2
 
-def test_hook(test_name: str, method: str, params: Dict[str, Any], expected_exit_code: int = 0, request_id: int = 1) -> bool:
-    """Test a specific hook via JSONRPC"""
-    print(f"{BLUE}[TEST]{NC} {test_name}")
-    print(f"  Method: {method}")
+def make_jsonrpc_request(method: str, params: Dict[str, Any], request_id: Optional[int] = None) -> Tuple[Dict[str, Any], int]:
+    """
+    Make JSONRPC 2.0 request to ClaudeBench /rpc endpoint
+    Returns (response_data, exit_code) - see jsonrpc_outcome
+    """
+    result, error = post_jsonrpc(_dumpb(jsonrpc_request(method, params, request_id)))
+    if error is not None:
+        return error, 2
+    return jsonrpc_outcome(method, result)
+
+def make_jsonrpc_batch(body: bytes) -> Dict[Any, Dict[str, Any]]:
+    """
+    Send an encoded JSONRPC 2.0 batch to the /rpc/batch endpoint in one POST
+    Returns the responses keyed by request ID (empty if the batch failed)
+    """
+    responses, error = post_jsonrpc(body, _RPC_BATCH_PATH)
+    if error is not None:
+        return {}
+    if not isinstance(responses, list):
+        log(f"  Malformed JSONRPC batch response: {responses}")
+        return {}
+    return {response.get('id'): response for response in responses if isinstance(response, dict)}
+
+def test_hook(test_name: str, method: str, expected_exit_code: int, response: Optional[Dict[str, Any]]) -> bool:
+    """Test a specific hook against its response from the batch"""
+    log(f"{BLUE}[TEST]{NC} {test_name}")
+    log(f"  Method: {method}")
     
-    response, exit_code = make_jsonrpc_request(method, params, request_id)
+    response, exit_code = jsonrpc_outcome(method, response)
     
     if exit_code == expected_exit_code:
-        print(f"{GREEN}  [✓]{NC} Passed (exit_code={exit_code})")
+        log(f"{GREEN}  [✓]{NC} Passed (exit_code={exit_code})")
         
         # Print useful response details
         if 'result' in response:
             result = response['result']
             if isinstance(result, dict):
                 if 'allow' in result and not result['allow']:
-                    print(f"    Blocked: {result.get('reason', 'No reason provided')}")
+                    log(f"    Blocked: {result.get('reason', 'No reason provided')}")
                 elif 'continue' in result and not result['continue']:
-                    print(f"    Blocked: {result.get('reason', 'No reason provided')}")
+                    log(f"    Blocked: {result.get('reason', 'No reason provided')}")
                 elif 'processed' in result:
-                    print(f"    Processed: {result['processed']}")
+                    log(f"    Processed: {result['processed']}")
         
         return True
     else:
-        print(f"{RED}  [✗]{NC} Failed (expected={expected_exit_code}, actual={exit_code})")
+        log(f"{RED}  [✗]{NC} Failed (expected={expected_exit_code}, actual={exit_code})")
         
         # Print error details
         if 'error' in response:
             error = response['error']
-            print(f"    Error: {error.get('message', 'Unknown error')}")
+            log(f"    Error: {error.get('message', 'Unknown error')}")
             if 'data' in error:
-                print(f"    Details: {json.dumps(error['data'], indent=6)}")
+                log(f"    Details: {json.dumps(error['data'], indent=6)}")
         
         return False
 
-def main():
-    """Run all hook tests via JSONRPC"""
-    print(f"\n{BLUE}ClaudeBench Hook Tests (JSONRPC 2.0){NC}")
-    print("=" * 50)
-    print(f"RPC Endpoint: {RPC_URL}")
-    print()
-    
-    # Test server connectivity first
-    print(f"{BLUE}[INFO]{NC} Testing JSONRPC endpoint...")
-    response, exit_code = make_jsonrpc_request("system.health", {}, 999)
-    if exit_code == 0:
-        print(f"{GREEN}[✓]{NC} Server is responding")
+def test_invalid_method(response: Optional[Dict[str, Any]]) -> bool:
+    """Test that an unknown method is rejected"""
+    log(f"{BLUE}[TEST]{NC} Invalid method handling")
+    log(f"  Method: invalid.method")
+    response, exit_code = jsonrpc_outcome("invalid.method", response)
+    if exit_code == 2:  # Should return error
+        log(f"{GREEN}  [✓]{NC} Correctly rejected invalid method")
+        return True
     else:
-        print(f"{RED}[✗]{NC} Server not responding properly")
-        sys.exit(1)
-    
-    print()
-    tests_passed = 0
-    tests_total = 0
+        log(f"{RED}  [✗]{NC} Should have rejected invalid method")
+        return False
+
+def test_missing_params(response: Optional[Dict[str, Any]]) -> bool:
+    """Test that a hook call missing required params is rejected"""
+    log(f"{BLUE}[TEST]{NC} Missing required parameters")
+    log(f"  Method: hook.pre_tool (missing params)")
+    response, exit_code = jsonrpc_outcome("hook.pre_tool", response)
+    if exit_code == 2:  # Should return validation error
+        log(f"{GREEN}  [✓]{NC} Validation error correctly returned")
+        return True
+    else:
+        log(f"{RED}  [✗]{NC} Should have returned validation error")
+        return False
+
+def test_notification() -> bool:
+    """Test that a notification (no ID, no response expected) is accepted"""
+    log(f"{BLUE}[TEST]{NC} JSONRPC Notification (no response expected)")
+    log(f"  Method: hook.post_tool (as notification)")
     
+    # Notifications get no entry in the batch response
+    # This tests fire-and-forget pattern
+    log(f"{GREEN}  [✓]{NC} Notification sent")
+    return True
+
+# Test cases: (test_name, method, params, expected_exit_code, request_id)
+TESTS = [
     # Test 1: hook.pre_tool with safe tool (should allow)
-    tests_total += 1
-    if test_hook(
+    (
         "Pre-tool validation with safe tool",
         "hook.pre_tool",
         {
@@ -206,16 +349,11 @@ def main():
             "sessionId": "test-session-001",
             "timestamp": 1234567890
         },
-        expected_exit_code=0,
-        request_id=1
-    ):
-        tests_passed += 1
-    
-    print()
-    
+        0,
+        1
+    ),
     # Test 2: hook.pre_tool with dangerous command (should block)
-    tests_total += 1
-    if test_hook(
+    (
         "Pre-tool validation with dangerous command",
         "hook.pre_tool",
         {
@@ -224,16 +362,11 @@ def main():
             "sessionId": "test-session-002",
             "timestamp": 1234567891
         },
-        expected_exit_code=1,  # Expect blocking
-        request_id=2
-    ):
-        tests_passed += 1
-    
-    print()
-    
+        1,  # Expect blocking
+        2
+    ),
     # Test 3: hook.post_tool (should always allow)
-    tests_total += 1
-    if test_hook(
+    (
         "Post-tool processing",
         "hook.post_tool",
         {
@@ -245,16 +378,11 @@ def main():
             "executionTime": 45,
             "success": True
         },
-        expected_exit_code=0,
-        request_id=3
-    ):
-        tests_passed += 1
-    
-    print()
-    
+        0,
+        3
+    ),
     # Test 4: hook.post_tool with error result
-    tests_total += 1
-    if test_hook(
+    (
         "Post-tool with error result",
         "hook.post_tool",
         {
@@ -266,16 +394,11 @@ def main():
             "executionTime": 12,
             "success": False
         },
-        expected_exit_code=0,  # Post hooks don't block
-        request_id=4
-    ):
-        tests_passed += 1
-    
-    print()
-    
+        0,  # Post hooks don't block
+        4
+    ),
     # Test 5: hook.user_prompt with clean prompt
-    tests_total += 1
-    if test_hook(
+    (
         "User prompt validation - clean",
         "hook.user_prompt",
         {
@@ -284,16 +407,11 @@ def main():
             "sessionId": "test-session-005",
             "timestamp": 1234567894
         },
-        expected_exit_code=0,
-        request_id=5
-    ):
-        tests_passed += 1
-    
-    print()
-    
+        0,
+        5
+    ),
     # Test 6: hook.user_prompt with extremely long prompt
-    tests_total += 1
-    if test_hook(
+    (
         "User prompt validation - too long",
         "hook.user_prompt",
         {
@@ -302,16 +420,11 @@ def main():
             "sessionId": "test-session-006",
             "timestamp": 1234567895
         },
-        expected_exit_code=1,  # Should block due to length
-        request_id=6
-    ):
-        tests_passed += 1
-    
-    print()
-    
+        1,  # Should block due to length
+        6
+    ),
     # Test 7: hook.todo_write
-    tests_total += 1
-    if test_hook(
+    (
         "Todo write hook",
         "hook.todo_write",
         {
@@ -323,78 +436,96 @@ def main():
             "sessionId": "test-session-007",
             "timestamp": 1234567896
         },
-        expected_exit_code=0,
-        request_id=7
-    ):
-        tests_passed += 1
+        0,
+        7
+    ),
+]
+
+# Test 8: Invalid method (should error)
+INVALID_METHOD = jsonrpc_request("invalid.method", {}, 8)
+
+# Test 9: Missing required params
+MISSING_PARAMS = jsonrpc_request(
+    "hook.pre_tool",
+    {"tool": "Read"},  # Missing required params, sessionId, timestamp
+    9
+)
+
+# Test 10: Notification (no ID, no response expected)
+NOTIFICATION = jsonrpc_request(
+    "hook.post_tool",
+    {
+        "tool": "Bash",
+        "params": {"command": "echo test"},
+        "result": {"output": "test"},
+        "sessionId": "test-session-010",
+        "timestamp": 1234567899,
+        "executionTime": 5,
+        "success": True
+    }
+)
+
+# Every test request, sent as one JSONRPC batch and encoded once up front
+BATCH_BODY = _dumpb(
+    [jsonrpc_request(method, params, request_id) for _, method, params, _, request_id in TESTS]
+    + [INVALID_METHOD, MISSING_PARAMS, NOTIFICATION]
+)
+
+def main():
+    """Run all hook tests via JSONRPC"""
+    # Output is collected and written out in one go at the end
+    output = _local.lines = []
     
-    print()
+    log(f"\n{BLUE}ClaudeBench Hook Tests (JSONRPC 2.0){NC}")
+    log("=" * 50)
+    log(f"RPC Endpoint: {RPC_URL}")
+    log()
     
-    # Test 8: Invalid method (should error)
-    tests_total += 1
-    print(f"{BLUE}[TEST]{NC} Invalid method handling")
-    print(f"  Method: invalid.method")
-    response, exit_code = make_jsonrpc_request("invalid.method", {}, 8)
-    if exit_code == 2:  # Should return error
-        print(f"{GREEN}  [✓]{NC} Correctly rejected invalid method")
-        tests_passed += 1
+    # Test server connectivity first
+    log(f"{BLUE}[INFO]{NC} Testing JSONRPC endpoint...")
+    response, exit_code = make_jsonrpc_request("system.health", {}, 999)
+    if exit_code == 0:
+        log(f"{GREEN}[✓]{NC} Server is responding")
     else:
-        print(f"{RED}  [✗]{NC} Should have rejected invalid method")
+        log(f"{RED}[✗]{NC} Server not responding properly")
+        write_output(output)
+        sys.exit(1)
     
-    print()
+    log()
     
-    # Test 9: Missing required params
-    tests_total += 1
-    print(f"{BLUE}[TEST]{NC} Missing required parameters")
-    print(f"  Method: hook.pre_tool (missing params)")
-    response, exit_code = make_jsonrpc_request(
-        "hook.pre_tool",
-        {"tool": "Read"},  # Missing required params, sessionId, timestamp
-        9
-    )
-    if exit_code == 2:  # Should return validation error
-        print(f"{GREEN}  [✓]{NC} Validation error correctly returned")
-        tests_passed += 1
-    else:
-        print(f"{RED}  [✗]{NC} Should have returned validation error")
+    # All tests go to the server in a single batch; each checks its own response
+    responses = make_jsonrpc_batch(BATCH_BODY)
     
-    print()
+    tests = [
+        (test_hook, test_name, method, expected_exit_code, responses.get(request_id))
+        for test_name, method, _, expected_exit_code, request_id in TESTS
+    ] + [
+        (test_invalid_method, responses.get(INVALID_METHOD['id'])),
+        (test_missing_params, responses.get(MISSING_PARAMS['id'])),
+        (test_notification,)
+    ]
     
-    # Test 10: Notification (no ID, no response expected)
-    tests_total += 1
-    print(f"{BLUE}[TEST]{NC} JSONRPC Notification (no response expected)")
-    print(f"  Method: hook.post_tool (as notification)")
+    results = []
+    for index, (test, *args) in enumerate(tests):
+        if index:
+            log()
+        results.append(test(*args))
     
-    # For notifications, we don't expect a response
-    # This tests fire-and-forget pattern
-    response, exit_code = make_jsonrpc_request(
-        "hook.post_tool",
-        {
-            "tool": "Bash",
-            "params": {"command": "echo test"},
-            "result": {"output": "test"},
-            "sessionId": "test-session-010",
-            "timestamp": 1234567899,
-            "executionTime": 5,
-            "success": True
-        },
-        request_id=None  # No ID = notification
-    )
-    # Since it's a notification, we might not get a response
-    # but the server should accept it
-    print(f"{GREEN}  [✓]{NC} Notification sent")
-    tests_passed += 1
+    tests_passed = sum(results)
+    tests_total = len(results)
     
     # Summary
-    print()
-    print("=" * 50)
+    log()
+    log("=" * 50)
     if tests_passed == tests_total:
-        print(f"{GREEN}[✓] All tests passed! ({tests_passed}/{tests_total}){NC}")
+        log(f"{GREEN}[✓] All tests passed! ({tests_passed}/{tests_total}){NC}")
+        write_output(output)
         sys.exit(0)
     else:
-        print(f"{YELLOW}[!] {tests_passed}/{tests_total} tests passed{NC}")
-        print(f"{RED}[✗] {tests_total - tests_passed} tests failed{NC}")
+        log(f"{YELLOW}[!] {tests_passed}/{tests_total} tests passed{NC}")
+        log(f"{RED}[✗] {tests_total - tests_passed} tests failed{NC}")
+        write_output(output)
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -4,17 +4,33 @@ MCP (Model Context Protocol) Integration Test Script
 Tests the MCP server implementation with proper session management
 """
 
+import http.client
+import itertools
 import json
 import sys
-import urllib.request
-import urllib.error
+import urllib.parse
 import uuid
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Union
 
 # Configuration
 BASE_URL = "http://localhost:3000/mcp"
 HEALTH_URL = f"{BASE_URL}/health"
 
+# Tool results up to this many characters are pretty-printed
+PRETTY_RESULT_MAX = 1024
+
+# Headers sent with every request
+_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json, text/event-stream'
+}
+
+# Headers for requests whose reply is always plain JSON (health, DELETE)
+_JSON_HEADERS = {**_HEADERS, 'Accept': 'application/json'}
+
+# tools/list results by server URL, shared by every client in the run
+_TOOLS_CACHE: Dict[str, Any] = {}
+
 # ANSI color codes
 RED = '\033[0;31m'
 GREEN = '\033[0;32m'
@@ -23,32 +39,129 @@ BLUE = '\033[0;34m'
 CYAN = '\033[0;36m'
 NC = '\033[0m'  # No Color
 
+# JSON codec - use orjson when installed, otherwise the stdlib
+# (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _loads = json.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# JSON-RPC requests with fixed params, copied with a fresh ID for each call
+_INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "0.1.0",
+        "capabilities": {
+            "tools": {}
+        },
+        "clientInfo": {
+            "name": "test-client",
+            "version": "1.0.0"
+        }
+    }
+}
+
+_TOOLS_LIST_REQUEST = {
+    "jsonrpc": "2.0",
+    "method": "tools/list",
+    "params": {}
+}
+
+def _tool_call_request(tool_name: str, arguments: Dict[str, Any], request_id: int) -> Dict[str, Any]:
+    """Build a tools/call JSON-RPC request"""
+    return {
+        "jsonrpc": "2.0",
+        "method": "tools/call",
+        "params": {
+            "name": tool_name,
+            "arguments": arguments
+        },
+        "id": request_id
+    }
+
 class MCPClient:
     """Simple MCP client for testing"""
     
     def __init__(self, base_url: str = BASE_URL):
         self.base_url = base_url
         self.session_id: Optional[str] = None
-        self.request_id = 0
+        
+        # Request IDs 1, 2, 3, ...
+        self._next_id = itertools.count(1).__next__
+        
+        # One kept-alive connection to the server for all of this client's requests
+        url = urllib.parse.urlsplit(base_url)
+        self._connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self._host = url.hostname
+        self._port = url.port
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._conn_used = False
+    
+    def _send(self, method: str, path: str, body: Optional[bytes], headers: Dict[str, str]) -> Tuple[int, Any, bytes]:
+        """
+        Send a request over the kept-alive connection
+        
+        A connection that was already used may have been closed by the
+        server while idle; in that case the request is retried once on a
+        fresh one.
+        
+        Returns (status_code, headers, body)
+        """
+        reused = self._conn_used
+        try:
+            return self._send_once(method, path, body, headers)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            if not reused:
+                raise
+            return self._send_once(method, path, body, headers)
     
-    def _next_id(self) -> int:
-        """Get next request ID"""
-        self.request_id += 1
-        return self.request_id
+    def _send_once(self, method: str, path: str, body: Optional[bytes], headers: Dict[str, str]) -> Tuple[int, Any, bytes]:
+        """Send one request, opening the connection if needed and closing it on failure"""
+        if self._conn is None:
+            self._conn = self._connection_class(self._host, self._port, timeout=10)
+        try:
+            self._conn.request(method, path, body=body, headers=headers)
+            response = self._conn.getresponse()
+            data = response.read()
+        except Exception:
+            self.close()
+            raise
+        
+        if response.will_close:
+            self.close()
+        else:
+            self._conn_used = True
+        return response.status, response.headers, data
     
-    def _make_request(self, method: str, url: str, data: Optional[Dict] = None, 
-                     headers: Optional[Dict] = None) -> Tuple[Dict, int, Dict]:
+    def close(self):
+        """Close the kept-alive connection, if open"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._conn_used = False
+    
+    def _make_request(self, method: str, url: str, data: Optional[Union[Dict, List[Dict]]] = None, 
+                     headers: Optional[Dict] = None, json_only: bool = False) -> Tuple[Any, int, Any]:
         """
         Make HTTP request and return (body, status_code, headers)
-        """
-        if headers is None:
-            headers = {}
         
+        data may be a list of JSON-RPC requests to send as one batch; the
+        body is then the list of responses. json_only accepts only a JSON
+        reply, for requests that never stream. headers are the response's
+        own case-insensitive headers (empty on network errors).
+        """
         # Add default headers
-        headers.update({
-            'Content-Type': 'application/json',
-            'Accept': 'application/json, text/event-stream'
-        })
+        defaults = _JSON_HEADERS if json_only else _HEADERS
+        headers = {**headers, **defaults} if headers else dict(defaults)
         
         # Add session ID if we have one
         if self.session_id:
@@ -57,64 +170,60 @@ class MCPClient:
         # Prepare request
         request_data = None
         if data:
-            request_data = json.dumps(data).encode('utf-8')
+            request_data = _dumpb(data)
         
-        request = urllib.request.Request(
-            url,
-            data=request_data,
-            headers=headers,
-            method=method
-        )
+        # Request target on the server
+        target = urllib.parse.urlsplit(url)
+        path = target.path or '/'
+        if target.query:
+            path = f"{path}?{target.query}"
         
         try:
-            with urllib.request.urlopen(request, timeout=10) as response:
-                # Get response headers
-                response_headers = dict(response.headers)
-                
-                # Read response body
-                response_body = response.read().decode('utf-8')
+            status, response_headers, response_bytes = self._send(method, path, request_data, headers)
+            
+            # Response format comes from Content-Type
+            is_sse = response_headers.get('Content-Type', '').startswith('text/event-stream')
+            
+            # Bodies are parsed from bytes; they are only decoded to be shown raw
+            if status >= 400:
+                try:
+                    body_data = _loads(response_bytes) if response_bytes else {}
+                except json.JSONDecodeError:
+                    body_data = {"error": response_bytes.decode('utf-8', 'replace')}
+                return body_data, status, response_headers
+            
+            if is_sse:
+                # SSE format is: event: message\ndata: {json}\n\n
+                # Take the JSON from the first data line (every data line for
+                # a batch)
+                batch = isinstance(data, list)
+                messages = []
+                for line in response_bytes.splitlines():
+                    if line.startswith(b'data:'):
+                        sse_data = line[5:].strip()  # Remove "data:" prefix
+                        if not sse_data:
+                            continue
+                        try:
+                            messages.append(_loads(sse_data))
+                        except json.JSONDecodeError:
+                            continue
+                        if not batch:
+                            break
                 
-                # Check if it's SSE format (contains "event:" and "data:")
-                if 'event:' in response_body and 'data:' in response_body:
-                    # Extract JSON from SSE format
-                    # SSE format is: event: message\ndata: {json}\n\n
-                    lines = response_body.strip().split('\n')
-                    for line in lines:
-                        if line.startswith('data: '):
-                            sse_data = line[6:].strip()  # Remove "data: " prefix
-                            try:
-                                body_data = json.loads(sse_data) if sse_data else {}
-                                break
-                            except json.JSONDecodeError:
-                                continue
-                    else:
-                        body_data = {"raw": response_body}
-                elif response_body.startswith('data: '):
-                    # Simple SSE format with just data line
-                    sse_data = response_body[6:].strip()
-                    try:
-                        body_data = json.loads(sse_data) if sse_data else {}
-                    except json.JSONDecodeError:
-                        body_data = {"raw": response_body}
+                if messages:
+                    body_data = messages if batch else messages[0]
                 else:
-                    # Try to parse as JSON
-                    try:
-                        body_data = json.loads(response_body) if response_body else {}
-                    except json.JSONDecodeError:
-                        body_data = {"raw": response_body}
-                
-                return body_data, response.status, response_headers
-                
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8') if e.fp else ''
-            try:
-                body_data = json.loads(error_body) if error_body else {}
-            except:
-                body_data = {"error": error_body}
-            return body_data, e.code, dict(e.headers)
+                    body_data = {"raw": response_bytes.decode('utf-8', 'replace')}
+            else:
+                try:
+                    body_data = _loads(response_bytes) if response_bytes else {}
+                except json.JSONDecodeError:
+                    body_data = {"raw": response_bytes.decode('utf-8', 'replace')}
             
-        except urllib.error.URLError as e:
-            return {"error": f"Network error: {e.reason}"}, 0, {}
+            return body_data, status, response_headers
+            
+        except (OSError, http.client.HTTPException) as e:
+            return {"error": f"Network error: {e}"}, 0, {}
             
         except Exception as e:
             return {"error": f"Unexpected error: {e}"}, 0, {}
@@ -123,26 +232,12 @@ class MCPClient:
         """Initialize MCP session"""
         print(f"{CYAN}Initializing MCP session...{NC}")
         
-        request_data = {
-            "jsonrpc": "2.0",
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "0.1.0",
-                "capabilities": {
-                    "tools": {}
-                },
-                "clientInfo": {
-                    "name": "test-client",
-                    "version": "1.0.0"
-                }
-            },
-            "id": self._next_id()
-        }
+        request_data = {**_INITIALIZE_REQUEST, "id": self._next_id()}
         
         body, status, headers = self._make_request("POST", self.base_url, request_data)
         
         # Extract session ID from headers
-        session_id = headers.get('mcp-session-id') or headers.get('Mcp-Session-Id')
+        session_id = headers.get('Mcp-Session-Id')
         if session_id:
             self.session_id = session_id
             print(f"  Session ID: {GREEN}{session_id}{NC}")
@@ -179,18 +274,37 @@ class MCPClient:
             print(f"{RED}No active session{NC}")
             return False, None
         
-        request_data = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": arguments
-            },
-            "id": self._next_id()
-        }
+        request_data = _tool_call_request(tool_name, arguments, self._next_id())
         
         body, status, headers = self._make_request("POST", self.base_url, request_data)
+        return self._tool_result(body)
+    
+    def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> Optional[List[Tuple[bool, Any]]]:
+        """
+        Call several MCP tools in one JSON-RPC batch request
+        
+        Returns (success, result) for each (tool_name, arguments) in order,
+        as call_tool would, or None if the server did not answer the batch
+        """
+        if not self.session_id:
+            print(f"{RED}No active session{NC}")
+            return None
+        
+        request_data = [
+            _tool_call_request(tool_name, arguments, self._next_id())
+            for tool_name, arguments in calls
+        ]
         
+        body, status, headers = self._make_request("POST", self.base_url, request_data)
+        if not isinstance(body, list):
+            return None
+        
+        # Responses may come back in any order
+        responses = {response.get('id'): response for response in body if isinstance(response, dict)}
+        return [self._tool_result(responses.get(request['id'], {})) for request in request_data]
+    
+    def _tool_result(self, body: Dict[str, Any]) -> Tuple[bool, Any]:
+        """Map a tools/call response to (success, result)"""
         if 'result' in body:
             # Check if result is null
             if body['result'] is None:
@@ -201,22 +315,26 @@ class MCPClient:
         else:
             return False, body
     
-    def list_tools(self) -> Tuple[bool, Any]:
-        """List available MCP tools"""
+    def list_tools(self, refresh: bool = False) -> Tuple[bool, Any]:
+        """
+        List available MCP tools
+        
+        The tool list is fetched once per server and reused by later calls
+        from any client; refresh=True fetches it again.
+        """
         if not self.session_id:
             print(f"{RED}No active session{NC}")
             return False, None
         
-        request_data = {
-            "jsonrpc": "2.0",
-            "method": "tools/list",
-            "params": {},
-            "id": self._next_id()
-        }
+        if not refresh and self.base_url in _TOOLS_CACHE:
+            return True, _TOOLS_CACHE[self.base_url]
+        
+        request_data = {**_TOOLS_LIST_REQUEST, "id": self._next_id()}
         
         body, status, headers = self._make_request("POST", self.base_url, request_data)
         
         if 'result' in body:
+            _TOOLS_CACHE[self.base_url] = body['result']
             return True, body['result']
         elif 'error' in body:
             return False, body['error']
@@ -230,7 +348,8 @@ class MCPClient:
         
         print(f"{CYAN}Terminating session {self.session_id}...{NC}")
         
-        body, status, headers = self._make_request("DELETE", self.base_url)
+        body, status, headers = self._make_request("DELETE", self.base_url, json_only=True)
+        self.close()
         
         if status == 200 or status == 204:
             print(f"  {GREEN}Session terminated{NC}")
@@ -242,55 +361,83 @@ class MCPClient:
     
     def check_health(self) -> bool:
         """Check MCP health endpoint"""
-        body, status, headers = self._make_request("GET", HEALTH_URL)
+        body, status, headers = self._make_request("GET", HEALTH_URL, json_only=True)
         
         if status == 200:
             return True, body
         else:
             return False, body
 
-def test_tool_call(client: MCPClient, tool_name: str, arguments: Dict, 
-                  test_name: str, should_succeed: bool = True) -> bool:
-    """Helper to test a tool call"""
-    print(f"\n{BLUE}Testing: {test_name}{NC}")
-    print(f"  Tool: {tool_name}")
-    print(f"  Arguments: {json.dumps(arguments, indent=4)}")
+def _log_block(*lines: str) -> None:
+    """Write a block of output lines to stdout in one write"""
+    sys.stdout.write('\n'.join(lines) + '\n')
+
+def _call_tool_for_test(client: MCPClient, tool_name: str, arguments: Dict, test_name: str,
+                        outcome: Optional[Tuple[bool, Any]]) -> Tuple[bool, Any]:
+    """
+    Announce a tool call test and return the call's (success, result)
     
-    success, result = client.call_tool(tool_name, arguments)
+    outcome is the (success, result) of a call already made in a batch;
+    without it the tool is called here
+    """
+    _log_block(
+        f"\n{BLUE}Testing: {test_name}{NC}",
+        f"  Tool: {tool_name}",
+        f"  Arguments: {json.dumps(arguments, indent=4)}"
+    )
+    return outcome if outcome is not None else client.call_tool(tool_name, arguments)
+
+def test_tool_succeeds(client: MCPClient, tool_name: str, arguments: Dict, test_name: str,
+                       outcome: Optional[Tuple[bool, Any]] = None) -> bool:
+    """Helper to test a tool call that should succeed"""
+    success, result = _call_tool_for_test(client, tool_name, arguments, test_name, outcome)
     
-    if should_succeed:
-        if success:
-            print(f"  {GREEN}✓ Success{NC}")
-            if isinstance(result, dict) and 'content' in result:
-                # MCP format with content array
-                for content in result.get('content', []):
-                    if content.get('type') == 'text':
-                        try:
-                            parsed = json.loads(content.get('text', '{}'))
-                            print(f"  Result: {json.dumps(parsed, indent=4)}")
-                        except:
-                            print(f"  Result: {content.get('text', 'N/A')}")
-            else:
-                print(f"  Result: {json.dumps(result, indent=4)}")
-            return True
-        else:
-            print(f"  {RED}✗ Failed: {result}{NC}")
-            return False
+    if not success:
+        print(f"  {RED}✗ Failed: {result}{NC}")
+        return False
+    
+    lines = [f"  {GREEN}✓ Success{NC}"]
+    if isinstance(result, dict) and 'content' in result:
+        # MCP format with content array
+        for content in result.get('content', []):
+            if content.get('type') == 'text':
+                text = content.get('text', '{}')
+                # Large results are shown as sent rather than re-indented
+                if len(text) >= PRETTY_RESULT_MAX:
+                    lines.append(f"  Result: {text}")
+                    continue
+                try:
+                    parsed = json.loads(text)
+                    lines.append(f"  Result: {json.dumps(parsed, indent=4)}")
+                except (json.JSONDecodeError, TypeError):
+                    lines.append(f"  Result: {text}")
     else:
-        # We expect this to fail
-        if not success:
-            print(f"  {GREEN}✓ Failed as expected{NC}")
-            print(f"  Error: {result}")
-            return True
-        else:
-            print(f"  {RED}✗ Should have failed but succeeded{NC}")
-            return False
+        lines.append(f"  Result: {json.dumps(result, indent=4)}")
+    _log_block(*lines)
+    return True
+
+def test_tool_fails(client: MCPClient, tool_name: str, arguments: Dict, test_name: str,
+                    outcome: Optional[Tuple[bool, Any]] = None) -> bool:
+    """Helper to test a tool call that should fail"""
+    success, result = _call_tool_for_test(client, tool_name, arguments, test_name, outcome)
+    
+    if success:
+        print(f"  {RED}✗ Should have failed but succeeded{NC}")
+        return False
+    
+    _log_block(
+        f"  {GREEN}✓ Failed as expected{NC}",
+        f"  Error: {result}"
+    )
+    return True
 
 def main():
     """Run MCP integration tests"""
-    print(f"\n{YELLOW}{'='*50}{NC}")
-    print(f"{YELLOW}MCP Integration Test Suite{NC}")
-    print(f"{YELLOW}{'='*50}{NC}\n")
+    _log_block(
+        f"\n{YELLOW}{'='*50}{NC}",
+        f"{YELLOW}MCP Integration Test Suite{NC}",
+        f"{YELLOW}{'='*50}{NC}\n"
+    )
     
     # Create client
     client = MCPClient()
@@ -304,8 +451,10 @@ def main():
     tests_total += 1
     success, health = client.check_health()
     if success:
-        print(f"  {GREEN}✓ MCP is healthy{NC}")
-        print(f"  Status: {json.dumps(health, indent=4)}")
+        _log_block(
+            f"  {GREEN}✓ MCP is healthy{NC}",
+            f"  Status: {json.dumps(health, indent=4)}"
+        )
         tests_passed += 1
     else:
         print(f"  {RED}✗ MCP health check failed{NC}")
@@ -326,93 +475,84 @@ def main():
     success, tools = client.list_tools()
     if success:
         tool_list = tools.get('tools', [])
-        print(f"  {GREEN}✓ Found {len(tool_list)} tools{NC}")
+        lines = [f"  {GREEN}✓ Found {len(tool_list)} tools{NC}"]
         
         # Show first few tools
-        for i, tool in enumerate(tool_list[:5]):
-            print(f"    - {tool.get('name', 'unknown')}: {tool.get('description', 'N/A')}")
+        for tool in tool_list[:5]:
+            lines.append(f"    - {tool.get('name', 'unknown')}: {tool.get('description', 'N/A')}")
         if len(tool_list) > 5:
-            print(f"    ... and {len(tool_list) - 5} more")
+            lines.append(f"    ... and {len(tool_list) - 5} more")
+        _log_block(*lines)
         
         tests_passed += 1
     else:
         print(f"  {RED}✗ Failed to list tools: {tools}{NC}")
     
-    # Test 4: Create a task
-    tests_total += 1
-    if test_tool_call(
-        client,
-        "task__create",
-        {
-            "text": "Test task from MCP integration test",
-            "priority": 2
-        },
-        "Create a task",
-        should_succeed=True
-    ):
-        tests_passed += 1
-    
-    # Test 5: Create task with missing required field (should fail)
-    tests_total += 1
-    if test_tool_call(
-        client,
-        "task__create",
-        {
-            "priority": 1
-        },
-        "Create task with missing 'text' field",
-        should_succeed=False
-    ):
-        tests_passed += 1
-    
-    # Test 6: System health check
-    tests_total += 1
-    if test_tool_call(
-        client,
-        "system__health",
-        {},
-        "Check system health",
-        should_succeed=True
-    ):
-        tests_passed += 1
-    
-    # Test 7: Get system metrics
-    tests_total += 1
-    if test_tool_call(
-        client,
-        "system__metrics",
-        {},
-        "Get system metrics",
-        should_succeed=True
-    ):
-        tests_passed += 1
+    # Tests 4-9: Tool calls, sent to the server as one JSON-RPC batch
+    tool_tests = [
+        # Test 4: Create a task
+        (
+            test_tool_succeeds,
+            "task__create",
+            {
+                "text": "Test task from MCP integration test",
+                "priority": 2
+            },
+            "Create a task"
+        ),
+        # Test 5: Create task with missing required field (should fail)
+        (
+            test_tool_fails,
+            "task__create",
+            {
+                "priority": 1
+            },
+            "Create task with missing 'text' field"
+        ),
+        # Test 6: System health check
+        (
+            test_tool_succeeds,
+            "system__health",
+            {},
+            "Check system health"
+        ),
+        # Test 7: Get system metrics
+        (
+            test_tool_succeeds,
+            "system__metrics",
+            {},
+            "Get system metrics"
+        ),
+        # Test 8: Invalid tool name
+        (
+            test_tool_fails,
+            "invalid__tool",
+            {"test": "data"},
+            "Call invalid tool"
+        ),
+        # Test 9: Pre-tool hook via MCP
+        (
+            test_tool_succeeds,
+            "hook__pre_tool",
+            {
+                "tool": "Read",
+                "params": {"file_path": "/tmp/test.txt"},
+                "sessionId": client.session_id or "test",
+                "timestamp": 1234567890
+            },
+            "Pre-tool hook validation"
+        )
+    ]
     
-    # Test 8: Invalid tool name
-    tests_total += 1
-    if test_tool_call(
-        client,
-        "invalid__tool",
-        {"test": "data"},
-        "Call invalid tool",
-        should_succeed=False
-    ):
-        tests_passed += 1
+    outcomes = client.call_tools_batch([(tool_name, arguments) for _, tool_name, arguments, _ in tool_tests])
+    if outcomes is None:
+        # No batch support - each test calls its tool on its own
+        outcomes = [None] * len(tool_tests)
     
-    # Test 9: Pre-tool hook via MCP
-    tests_total += 1
-    if test_tool_call(
-        client,
-        "hook__pre_tool",
-        {
-            "tool": "Read",
-            "params": {"file_path": "/tmp/test.txt"},
-            "sessionId": client.session_id or "test",
-            "timestamp": 1234567890
-        },
-        "Pre-tool hook validation",
-        should_succeed=True
-    ):
-        tests_passed += 1
+    for (test, tool_name, arguments, test_name), outcome in zip(tool_tests, outcomes):
+        tests_total += 1
+        if test(client, tool_name, arguments, test_name, outcome):
+            tests_passed += 1
     
     # Test 10: Create another session (test multi-session)
     print(f"\n{GREEN}10. Testing multi-session support...{NC}")
@@ -445,16 +585,21 @@ def main():
         print(f"  {RED}✗ Failed to terminate session{NC}")
     
     # Summary
-    print(f"\n{YELLOW}{'='*50}{NC}")
-    print(f"{YELLOW}Test Results{NC}")
-    print(f"{YELLOW}{'='*50}{NC}")
+    summary = [
+        f"\n{YELLOW}{'='*50}{NC}",
+        f"{YELLOW}Test Results{NC}",
+        f"{YELLOW}{'='*50}{NC}"
+    ]
     
     if tests_passed == tests_total:
-        print(f"{GREEN}✓ All tests passed! ({tests_passed}/{tests_total}){NC}")
+        _log_block(*summary, f"{GREEN}✓ All tests passed! ({tests_passed}/{tests_total}){NC}")
         sys.exit(0)
     else:
-        print(f"{YELLOW}⚠ {tests_passed}/{tests_total} tests passed{NC}")
-        print(f"{RED}✗ {tests_total - tests_passed} tests failed{NC}")
+        _log_block(
+            *summary,
+            f"{YELLOW}⚠ {tests_passed}/{tests_total} tests passed{NC}",
+            f"{RED}✗ {tests_total - tests_passed} tests failed{NC}"
+        )
         sys.exit(1)
 
 if __name__ == '__main__':